@@ -0,0 +1,133 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+
+# "1,23,456.00 Dr" / "(1,234.50)" / "1234.5 CR."
+_DR_CR_SUFFIX = re.compile(r"^(.*?)\s*(dr|cr)\.?$", re.IGNORECASE)
+_SUFFIX_ENDINGS = ("dr", "cr", "dr.", "cr.")
+_NULL_TOKENS = {"", "nan", "none"}
+
+
+def parse_amount(
+    value,
+    default=0.0,
+    negative_parentheses=False,
+    dr_cr_suffix=False,
+    absolute=False
+):
+    """
+    Parses one amount. Grouping commas are dropped, so Indian lakh grouping
+    ("1,00,000.00") parses like Western grouping.
+      default               returned for blanks, "nan"/"none" and unparseable text
+      negative_parentheses  "(123.00)" -> -123.0
+      dr_cr_suffix          "123.00 Dr" -> -123.0, "123.00 Cr" -> 123.0
+      absolute              drop the sign
+    parse_amounts applies the same rules to a whole column.
+    """
+
+    if value is None or (np.isscalar(value) and pd.isna(value)):
+        return default
+
+    if isinstance(value, (int, float, np.number)) and not isinstance(value, (bool, np.bool_)):
+        number = float(value)
+    else:
+        text = str(value).replace(",", "").strip()
+        sign = 1.0
+
+        if dr_cr_suffix:
+            match = _DR_CR_SUFFIX.match(text)
+            if match:
+                text = match.group(1)
+                if match.group(2).lower() == "dr":
+                    sign = -sign
+
+        if negative_parentheses and text.startswith("(") and text.endswith(")"):
+            text = text[1:-1].strip()
+            sign = -sign
+
+        if text.lower() in _NULL_TOKENS:
+            return default
+
+        try:
+            number = float(text) * sign
+        except ValueError:
+            return default
+
+    if number != number:
+        return default
+
+    return abs(number) if absolute else number
+
+
+def parse_amounts(
+    values,
+    default=0.0,
+    negative_parentheses=False,
+    dr_cr_suffix=False,
+    absolute=False
+):
+    """
+    Column version of parse_amount: one pass of string operations and a
+    single pd.to_numeric instead of a Python call per value. Returns a float
+    Series on the same index; default=None leaves NaN for missing values.
+    """
+
+    if not isinstance(values, pd.Series):
+        values = pd.Series(values)
+
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        numbers = values.astype(float)
+    else:
+        # Blank out missing values first so .str works even on an all-NaN column
+        text = values.astype(object).where(values.notna(), "").map(str)
+        text = text.str.replace(",", "", regex=False).str.strip()
+        sign = np.ones(len(text))
+
+        if dr_cr_suffix:
+            # Run the regex only on the values that can carry a suffix
+            suffixed = text.str.lower().str.endswith(_SUFFIX_ENDINGS).to_numpy(dtype=bool)
+            if suffixed.any():
+                parts = text[suffixed].str.extract(_DR_CR_SUFFIX)
+                text = text.copy()
+                text[suffixed] = parts[0].to_numpy(dtype=object)
+                sign[suffixed] = np.where(parts[1].str.lower() == "dr", -1.0, 1.0)
+
+        if negative_parentheses:
+            wrapped = (text.str.startswith("(") & text.str.endswith(")")).to_numpy(dtype=bool)
+            if wrapped.any():
+                text = text.copy()
+                text[wrapped] = text[wrapped].str[1:-1].str.strip().to_numpy(dtype=object)
+                sign[wrapped] = -sign[wrapped]
+
+        numbers = pd.to_numeric(text, errors="coerce") * sign
+
+    if absolute:
+        numbers = numbers.abs()
+
+    if default is not None:
+        numbers = numbers.fillna(default)
+
+    return numbers
+
+
+def to_paise(amount):
+    """
+    Rupees to integer paise for exact keys and sums; None stays None.
+    """
+
+    if amount is None:
+        return None
+    return int(round(amount * 100))
+
+
+def to_paise_array(amounts):
+    # Callers fill missing values first; NaN has no integer form
+    return np.rint(np.asarray(amounts, dtype=float) * 100).astype(np.int64)
+
+
+def format_paise(paise):
+    sign = "-" if paise < 0 else ""
+    rupees, paise = divmod(abs(int(paise)), 100)
+    return f"{sign}{rupees:,}.{paise:02d}"
@@ -1,6 +1,8 @@
 import json
 from datetime import datetime
 
+from core.amounts import parse_amount, to_paise
+
 
 _DATE_FORMATS = (
     "%d-%m-%Y",
@@ -36,18 +38,7 @@ def normalize_ledger(value):
 
 
 def normalize_amount(value):
-    if value is None:
-        return None
-
-    text = str(value).replace(",", "").strip()
-    text = text.replace("(", "-").replace(")", "")
-    if not text:
-        return None
-
-    try:
-        return abs(float(text))
-    except ValueError:
-        return None
+    return parse_amount(value, default=None, negative_parentheses=True, absolute=True)
 
 
 def _extract_contra_details(payload):
@@ -76,7 +67,7 @@ def load_existing_contras(json_path):
         amount_value = entry.get("dspvchcramt")
         if amount_value is None:
             amount_value = entry.get("dspvchdramt")
-        amount_key = normalize_amount(amount_value)
+        amount_key = to_paise(normalize_amount(amount_value))
 
         if date_key is None or not ledger_key or amount_key is None:
             continue
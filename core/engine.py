@@ -1,6 +1,5 @@
 from core.duplicate_filter import (
     load_existing_contras,
-    normalize_amount,
     normalize_date,
     normalize_ledger,
 )
@@ -17,11 +16,15 @@ class VoucherEngine:
         if duplicate_json_path:
             self.existing_contras = load_existing_contras(duplicate_json_path)
 
-    def process(self, transactions):
+    def process(self, transactions, matched_rules=None):
+        # matched_rules lets callers supply rules they already resolved
+        # (incremental runs) instead of matching every transaction here.
+        if matched_rules is None:
+            matched_rules = [self.rule_engine.match(txn) for txn in transactions]
+
         vouchers = []
 
-        for txn in transactions:
-            rule = self.rule_engine.match(txn)
+        for txn, rule in zip(transactions, matched_rules):
 
             if not rule:
                 self.unclassified.append(txn)
@@ -40,7 +43,7 @@ class VoucherEngine:
                     duplicate_key = (
                         normalize_date(voucher.get("Date")),
                         normalize_ledger(voucher.get("Cr_Ledger")),
-                        normalize_amount(voucher.get("Amount")),
+                        txn.amount_paise,
                     )
 
                     if (
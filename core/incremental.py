@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+
+
+def file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def rule_fingerprint(rule):
+    return hashlib.sha1(
+        json.dumps(rule, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+def transaction_keys(transactions):
+    """
+    Identifies each row by its content plus how many identical rows came
+    before it, so repeated same-day entries keep distinct keys.
+    """
+
+    seen = {}
+    keys = []
+
+    for txn in transactions:
+        content = "|".join(
+            str(value)
+            for value in (txn.date, txn.description, txn.withdrawal_paise, txn.deposit_paise, txn.reference)
+        )
+        digest = hashlib.sha1(content.encode("utf-8")).hexdigest()
+        occurrence = seen.get(digest, 0)
+        seen[digest] = occurrence + 1
+        keys.append(f"{digest}#{occurrence}")
+
+    return keys
+
+
+def load_state(state_path):
+    if not os.path.exists(state_path):
+        return {}
+
+    with open(state_path, "r") as f:
+        return json.load(f)
+
+
+def save_state(state_path, state):
+    os.makedirs(os.path.dirname(state_path) or ".", exist_ok=True)
+
+    with open(state_path, "w") as f:
+        json.dump(state, f)
+
+
+class IncrementalClassifier:
+    """
+    Re-uses the rule assignments of a previous run of the same statement.
+    Rules are identified by a fingerprint of their JSON, so an edited rule
+    counts as removed plus added. A kept rule counts as moved when a kept
+    rule that used to rank below it now ranks above it (e.g. equal-priority
+    rules reordered in the file). For each transaction:
+      - unknown row, or its rule was removed or moved: full match;
+      - previously unclassified: only the added rules can match now;
+      - previously matched rule still in place: only added rules ranked
+        above it can take over.
+    """
+
+    def __init__(self, rule_engine, previous=None):
+        self.rule_engine = rule_engine
+        self.previous = previous or {}
+
+        self.fingerprints = [rule_fingerprint(rule) for rule in rule_engine.rules]
+        self.positions = {}
+        for position, fingerprint in enumerate(self.fingerprints):
+            self.positions.setdefault(fingerprint, position)
+
+        previous_positions = {}
+        for position, fingerprint in enumerate(self.previous.get("rules", [])):
+            previous_positions.setdefault(fingerprint, position)
+
+        self.added = [
+            position
+            for position, fingerprint in enumerate(self.fingerprints)
+            if fingerprint not in previous_positions
+        ]
+        self.moved = self._moved_rules(previous_positions)
+
+        self.reevaluated = 0
+        self.reused = 0
+
+    def _moved_rules(self, previous_positions):
+        # A kept rule is still in place if every kept rule above it was
+        # above it last time too; then no old rule can have taken over.
+        moved = set()
+        highest = -1
+
+        for fingerprint in self.fingerprints:
+            previous_position = previous_positions.get(fingerprint)
+            if previous_position is None:
+                continue
+
+            if previous_position < highest:
+                moved.add(fingerprint)
+            highest = max(highest, previous_position)
+
+        return moved
+
+    def classify(self, transactions, keys):
+        previous_assignments = self.previous.get("assignments", {})
+        rules = []
+
+        for txn, key in zip(transactions, keys):
+            if key not in previous_assignments:
+                rules.append(self.rule_engine.match(txn))
+                self.reevaluated += 1
+                continue
+
+            fingerprint = previous_assignments[key]
+
+            if fingerprint is None:
+                rules.append(self._match_added(txn, len(self.fingerprints)))
+                self.reevaluated += 1
+                continue
+
+            position = self.positions.get(fingerprint)
+
+            if position is None or fingerprint in self.moved:
+                rules.append(self.rule_engine.match(txn))
+                self.reevaluated += 1
+                continue
+
+            override = self._match_added(txn, position)
+            rules.append(override or self.rule_engine.rules[position])
+
+            if override:
+                self.reevaluated += 1
+            else:
+                self.reused += 1
+
+        return rules
+
+    def _match_added(self, txn, before_position):
+        description = txn.description.strip()
+
+        for position in self.added:
+            if position >= before_position:
+                break
+
+            rule, patterns = self.rule_engine.compiled_rules[position]
+            if any(pattern.search(description) for pattern in patterns):
+                return rule
+
+        return None
+
+    def assignments(self, keys, rules):
+        return {
+            key: rule_fingerprint(rule) if rule else None
+            for key, rule in zip(keys, rules)
+        }
@@ -0,0 +1,198 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+_DONE = object()
+
+
+class StageFailure:
+    def __init__(self, stage_name, item, error):
+        self.stage_name = stage_name
+        self.item = item
+        self.error = error
+
+
+class StageMetrics:
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.failures = 0
+        self.busy_seconds = 0.0
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def wall_seconds(self):
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+    @property
+    def throughput(self):
+        if self.wall_seconds <= 0:
+            return 0.0
+        return self.items / self.wall_seconds
+
+    def describe(self):
+        return (
+            f"{self.name:<10} items: {self.items:>4}  "
+            f"failed: {self.failures:>3}  "
+            f"busy: {self.busy_seconds:8.2f}s  "
+            f"wall: {self.wall_seconds:8.2f}s  "
+            f"rate: {self.throughput:6.2f}/s"
+        )
+
+
+class Stage:
+    """
+    One step of a StagedPipeline.
+    With processes=True, func runs in a process pool of `workers` processes
+    (func and its items must be picklable); otherwise it runs on the stage's
+    own thread.
+    """
+
+    def __init__(self, name, func, workers=1, processes=False):
+        self.name = name
+        self.func = func
+        self.workers = max(1, int(workers))
+        self.processes = processes
+
+
+class StagedPipeline:
+    """
+    Runs items through a chain of stages concurrently, so that while one
+    item is in the last stage the next ones are already in earlier stages.
+    Stages are connected by bounded queues of size max_pending, which caps
+    how many intermediate results are held in memory at once.
+    A failing item is passed downstream as a StageFailure and skipped by the
+    remaining stages.
+    """
+
+    def __init__(self, stages, max_pending=1):
+        self.stages = stages
+        self.max_pending = max(1, int(max_pending))
+        self.metrics = {stage.name: StageMetrics(stage.name) for stage in stages}
+
+    def run(self, items):
+        queues = [queue.Queue(maxsize=self.max_pending) for _ in self.stages]
+        queues.append(queue.Queue())
+
+        threads = [threading.Thread(target=self._feed, args=(items, queues[0]), daemon=True)]
+
+        for index, stage in enumerate(self.stages):
+            threads.append(
+                threading.Thread(
+                    target=self._run_stage,
+                    args=(stage, queues[index], queues[index + 1]),
+                    daemon=True
+                )
+            )
+
+        for thread in threads:
+            thread.start()
+
+        results = []
+
+        while True:
+            item = queues[-1].get()
+            if item is _DONE:
+                break
+            results.append(item)
+
+        for thread in threads:
+            thread.join()
+
+        return results
+
+    def report(self):
+        return [self.metrics[stage.name].describe() for stage in self.stages]
+
+    def _feed(self, items, out_queue):
+        for item in items:
+            out_queue.put(item)
+        out_queue.put(_DONE)
+
+    def _run_stage(self, stage, in_queue, out_queue):
+        metrics = self.metrics[stage.name]
+
+        if stage.processes:
+            with ProcessPoolExecutor(max_workers=stage.workers) as executor:
+                self._run_process_stage(stage, executor, metrics, in_queue, out_queue)
+        else:
+            self._run_thread_stage(stage, metrics, in_queue, out_queue)
+
+        metrics.finished_at = time.perf_counter()
+        out_queue.put(_DONE)
+
+    def _run_thread_stage(self, stage, metrics, in_queue, out_queue):
+        while True:
+            item = in_queue.get()
+            if item is _DONE:
+                return
+
+            if isinstance(item, StageFailure):
+                out_queue.put(item)
+                continue
+
+            if metrics.started_at is None:
+                metrics.started_at = time.perf_counter()
+
+            started = time.perf_counter()
+            try:
+                result = stage.func(item)
+            except (Exception, SystemExit) as e:
+                # safe_excel_write exits on a locked file; treat that as a
+                # failed item rather than killing the stage thread.
+                metrics.failures += 1
+                result = StageFailure(stage.name, item, e)
+            else:
+                metrics.items += 1
+
+            metrics.busy_seconds += time.perf_counter() - started
+            out_queue.put(result)
+
+    def _run_process_stage(self, stage, executor, metrics, in_queue, out_queue):
+        # Keep up to `workers` items in flight and hand results downstream in
+        # submission order.
+        in_flight = deque()
+
+        while True:
+            item = in_queue.get()
+            if item is _DONE:
+                break
+
+            if isinstance(item, StageFailure):
+                in_flight.append((item, None, None))
+            else:
+                if metrics.started_at is None:
+                    metrics.started_at = time.perf_counter()
+                in_flight.append((item, executor.submit(stage.func, item), time.perf_counter()))
+
+            if len(in_flight) >= stage.workers:
+                self._forward_oldest(stage, metrics, in_flight, out_queue)
+
+        while in_flight:
+            self._forward_oldest(stage, metrics, in_flight, out_queue)
+
+    def _forward_oldest(self, stage, metrics, in_flight, out_queue):
+        item, future, submitted = in_flight.popleft()
+
+        if future is None:
+            out_queue.put(item)
+            return
+
+        try:
+            result = future.result()
+        except (Exception, SystemExit) as e:
+            # A worker's SystemExit comes back through the future; it fails
+            # the item, not the whole pipeline.
+            metrics.failures += 1
+            result = StageFailure(stage.name, item, e)
+        else:
+            metrics.items += 1
+
+        metrics.busy_seconds += time.perf_counter() - submitted
+        out_queue.put(result)
@@ -0,0 +1,248 @@
+import json
+import os
+import re
+import sys
+from collections import Counter
+
+import pandas as pd
+
+from core.rule_engine import RuleEngine, rule_patterns
+from utils.cli import expand_inputs, parse_args
+from utils.file_writer import safe_excel_write
+
+
+# -----------------------------------------------------
+# Analysis
+# -----------------------------------------------------
+
+def analyze_rules(rules, descriptions):
+    """
+    Runs every pattern of `rules` (already in priority order) against a
+    corpus of descriptions and records, per pattern, how often it matched
+    and how often it was the first match (the one RuleEngine returns).
+    Also counts conflicts: descriptions matched by rules that would post to
+    a different voucher type or ledger than the winning rule.
+    """
+
+    compiled = [
+        (rule_index, pattern_index, re.compile(pattern, re.IGNORECASE))
+        for rule_index, rule in enumerate(rules)
+        for pattern_index, pattern in enumerate(rule_patterns(rule))
+    ]
+
+    stats = {
+        (rule_index, pattern_index): {"hits": 0, "wins": 0, "shadowed_by": Counter()}
+        for rule_index, pattern_index, _ in compiled
+    }
+    conflicts = {}
+
+    corpus = Counter(str(description).strip() for description in descriptions)
+
+    for description, count in corpus.items():
+        matched = [
+            (rule_index, pattern_index)
+            for rule_index, pattern_index, regex in compiled
+            if regex.search(description)
+        ]
+
+        if not matched:
+            continue
+
+        winner = matched[0]
+        stats[winner]["wins"] += count
+
+        for key in matched:
+            stats[key]["hits"] += count
+
+            if key == winner:
+                continue
+
+            stats[key]["shadowed_by"][winner] += count
+
+            if _target(rules[key[0]]) != _target(rules[winner[0]]):
+                conflict = conflicts.setdefault(
+                    (winner[0], key[0]),
+                    {"count": 0, "example": description}
+                )
+                conflict["count"] += count
+
+    return {
+        "corpus_size": sum(corpus.values()),
+        "patterns": stats,
+        "conflicts": conflicts,
+    }
+
+
+def _target(rule):
+    return rule.get("voucher_type"), rule.get("ledger")
+
+
+def pattern_status(stat):
+    if stat["wins"]:
+        return "reachable"
+    if stat["hits"]:
+        return "shadowed"
+    return "unmatched"
+
+
+def prune_rules(rules, report, drop_shadowed=False, drop_unmatched=False):
+    """
+    Returns a copy of `rules` without the patterns that never won on the
+    corpus, as far as asked for. Both kinds are kept by default: a shadowed
+    pattern can still be the only one to match a future description, and
+    an unmatched one may match future statements.
+    Rules left with no patterns are removed.
+    """
+
+    pruned = []
+
+    for rule_index, rule in enumerate(rules):
+        kept = []
+
+        for pattern_index, pattern in enumerate(rule_patterns(rule)):
+            status = pattern_status(report["patterns"][(rule_index, pattern_index)])
+
+            if status == "shadowed" and drop_shadowed:
+                continue
+            if status == "unmatched" and drop_unmatched:
+                continue
+
+            kept.append(pattern)
+
+        if kept:
+            pruned.append(dict(rule, pattern=kept))
+
+    return pruned
+
+
+# -----------------------------------------------------
+# Reporting
+# -----------------------------------------------------
+
+def pattern_report_frame(rules, report):
+    rows = []
+
+    for (rule_index, pattern_index), stat in report["patterns"].items():
+        rule = rules[rule_index]
+        shadowed_by = ""
+
+        if stat["shadowed_by"]:
+            (winner_rule, winner_pattern), _ = stat["shadowed_by"].most_common(1)[0]
+            shadowed_by = (
+                f"{rules[winner_rule].get('ledger')}: "
+                f"{rule_patterns(rules[winner_rule])[winner_pattern]}"
+            )
+
+        rows.append({
+            "Priority": rule.get("priority", 0),
+            "Voucher_Type": rule.get("voucher_type"),
+            "Ledger": rule.get("ledger"),
+            "Pattern": rule_patterns(rule)[pattern_index],
+            "Hits": stat["hits"],
+            "Wins": stat["wins"],
+            "Status": pattern_status(stat),
+            "Shadowed_By": shadowed_by,
+        })
+
+    return pd.DataFrame(rows)
+
+
+def conflict_report_frame(rules, report):
+    rows = []
+
+    for (winner_index, loser_index), conflict in report["conflicts"].items():
+        winner = rules[winner_index]
+        loser = rules[loser_index]
+
+        rows.append({
+            "Winning_Ledger": winner.get("ledger"),
+            "Winning_Type": winner.get("voucher_type"),
+            "Winning_Priority": winner.get("priority", 0),
+            "Shadowed_Ledger": loser.get("ledger"),
+            "Shadowed_Type": loser.get("voucher_type"),
+            "Shadowed_Priority": loser.get("priority", 0),
+            "Descriptions": conflict["count"],
+            "Example": conflict["example"],
+        })
+
+    df = pd.DataFrame(rows)
+    if not df.empty:
+        df = df.sort_values("Descriptions", ascending=False)
+
+    return df
+
+
+def load_corpus(paths):
+    descriptions = []
+
+    for path in paths:
+        df = pd.read_excel(path)
+        if "Description" not in df.columns:
+            print(f"Skipping {path}: no Description column.")
+            continue
+
+        descriptions.extend(df["Description"].dropna().astype(str).tolist())
+
+    return descriptions
+
+
+# -----------------------------------------------------
+# Command Line
+# -----------------------------------------------------
+# python -m core.rule_analyzer <statement xlsx | dir | glob> ...
+#     [--rules=...] [--report=...] [--compiled=...] [--drop-shadowed] [--drop-unmatched]
+
+def main(argv):
+    args, options = parse_args(argv)
+
+    rule_path = options.get("rules", "./rules/description_rules.json")
+    report_path = options.get("report", "./output/rule_report.xlsx")
+    compiled_path = options.get("compiled", "./output/compiled_rules.json")
+
+    corpus_files = []
+    for arg in args:
+        corpus_files.extend(expand_inputs(arg, [".xlsx"]))
+
+    if not corpus_files:
+        print("No corpus files given (bank_statement.xlsx or unclassified.xlsx exports).")
+        return
+
+    rules = RuleEngine(rule_path).rules
+    descriptions = load_corpus(corpus_files)
+    report = analyze_rules(rules, descriptions)
+
+    patterns_df = pattern_report_frame(rules, report)
+    conflicts_df = conflict_report_frame(rules, report)
+    pruned = prune_rules(
+        rules,
+        report,
+        drop_shadowed=bool(options.get("drop_shadowed")),
+        drop_unmatched=bool(options.get("drop_unmatched"))
+    )
+
+    os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+
+    def write_report():
+        with pd.ExcelWriter(report_path, engine="openpyxl") as writer:
+            patterns_df.to_excel(writer, sheet_name="Patterns", index=False)
+            conflicts_df.to_excel(writer, sheet_name="Conflicts", index=False)
+
+    safe_excel_write(write_report, report_path)
+
+    with open(compiled_path, "w") as f:
+        json.dump(pruned, f, indent=2)
+
+    status_counts = patterns_df["Status"].value_counts() if not patterns_df.empty else {}
+    kept_patterns = sum(len(rule_patterns(rule)) for rule in pruned)
+
+    print(f"Descriptions analysed : {report['corpus_size']}")
+    print(f"Patterns reachable    : {status_counts.get('reachable', 0)}")
+    print(f"Patterns shadowed     : {status_counts.get('shadowed', 0)}")
+    print(f"Patterns unmatched    : {status_counts.get('unmatched', 0)}")
+    print(f"Rule conflicts        : {len(conflicts_df)}")
+    print(f"Compiled rules        : {len(pruned)} rules, {kept_patterns} patterns -> {compiled_path}")
+    print(f"Report                : {report_path}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
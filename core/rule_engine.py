@@ -2,25 +2,57 @@ import json
 import re
 
 
+def rule_patterns(rule):
+    patterns = rule["pattern"]
+
+    if isinstance(patterns, str):
+        patterns = [patterns]
+
+    return patterns
+
+
 class RuleEngine:
     def __init__(self, rule_path):
         with open(rule_path, "r") as f:
-            self.rules = json.load(f)
+            self._load(json.load(f))
+
+    @classmethod
+    def from_rules(cls, rules):
+        """
+        Builds an engine from already loaded rules, e.g. a snapshot handed to
+        worker processes, without reading description_rules.json again.
+        """
+
+        engine = cls.__new__(cls)
+        engine._load(list(rules))
+        return engine
+
+    def _load(self, rules):
+        self.rules = rules
 
         # Highest priority first
         self.rules.sort(key=lambda r: r.get("priority", 0), reverse=True)
 
+        # Compile once instead of going through the re cache per transaction
+        self.compiled_rules = [
+            (rule, [re.compile(pattern, re.IGNORECASE) for pattern in rule_patterns(rule)])
+            for rule in self.rules
+        ]
+
     def match(self, transaction):
-        description = transaction.description.strip()
+        return self.match_description(transaction.description)
 
-        for rule in self.rules:
-            patterns = rule["pattern"]
+    def match_description(self, description):
+        index = self.match_index(description)
+        return self.rules[index] if index is not None else None
 
-            if isinstance(patterns, str):
-                patterns = [patterns]
+    def match_index(self, description):
+        # Position of the first matching rule in self.rules
+        description = description.strip()
 
+        for index, (rule, patterns) in enumerate(self.compiled_rules):
             for pattern in patterns:
-                if re.search(pattern, description, re.IGNORECASE):
-                    return rule  # ← only rule
+                if pattern.search(description):
+                    return index  # ← only rule
 
         return None
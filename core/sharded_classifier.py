@@ -0,0 +1,164 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from core.rule_engine import RuleEngine
+from utils.cli import expand_inputs, parse_args
+
+
+# Set once per worker process by _init_worker
+_WORKER_ENGINE = None
+
+
+def _init_worker(rules):
+    # The rules arrive as a plain list of dicts: inherited as-is under fork,
+    # a small pickle under spawn (Windows). Each worker compiles them once.
+    global _WORKER_ENGINE
+    _WORKER_ENGINE = RuleEngine.from_rules(rules)
+
+
+def _match_chunk(descriptions):
+    return [_WORKER_ENGINE.match_index(description) for description in descriptions]
+
+
+class ShardedClassifier:
+    """
+    Matches descriptions against a RuleEngine's rules in a process pool, so
+    large re-classification runs use every core instead of one.
+    Descriptions are split into contiguous chunks and the per-chunk results
+    are joined in input order, giving the same answer as
+    RuleEngine.match_index row by row.
+    Inputs smaller than one chunk, or workers=1, are matched in-process.
+    Use as a context manager (or call close) to shut the pool down.
+    """
+
+    def __init__(self, rule_engine, workers=None, chunk_size=5000):
+        self.rule_engine = rule_engine
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        self.chunk_size = max(1, int(chunk_size))
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _pool(self):
+        # Started on first use and kept for later calls (chunked runs)
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.rule_engine.rules,)
+            )
+        return self._executor
+
+    def match_indices(self, descriptions):
+        """
+        Returns, for every description, the index of its rule in
+        rule_engine.rules, or None if no rule matches.
+        """
+
+        descriptions = list(descriptions)
+
+        if self.workers == 1 or len(descriptions) <= self.chunk_size:
+            return [self.rule_engine.match_index(description) for description in descriptions]
+
+        chunks = [
+            descriptions[start:start + self.chunk_size]
+            for start in range(0, len(descriptions), self.chunk_size)
+        ]
+
+        indices = []
+        for chunk_indices in self._pool().map(_match_chunk, chunks):
+            indices.extend(chunk_indices)
+
+        return indices
+
+    def match_all(self, transactions):
+        # Rules per transaction, in the form VoucherEngine.process accepts
+        rules = self.rule_engine.rules
+        return [
+            rules[index] if index is not None else None
+            for index in self.match_indices(txn.description for txn in transactions)
+        ]
+
+
+# -----------------------------------------------------
+# Benchmark
+# -----------------------------------------------------
+# python -m core.sharded_classifier <statement xlsx | dir | glob> ...
+#     [--rules=...] [--workers=1,2,4] [--chunk-size=5000] [--repeat=N]
+
+def benchmark(rule_engine, descriptions, worker_counts, chunk_size=5000):
+    """
+    Classifies the same descriptions with each worker count and returns
+    (workers, seconds, descriptions per second) rows. Pool start-up is
+    included, as it would be in a real run. Every run is checked against
+    the single-process result.
+    """
+
+    baseline = None
+    results = []
+
+    for workers in worker_counts:
+        started = time.perf_counter()
+        with ShardedClassifier(rule_engine, workers, chunk_size) as classifier:
+            indices = classifier.match_indices(descriptions)
+        seconds = time.perf_counter() - started
+
+        if baseline is None:
+            baseline = indices
+        elif indices != baseline:
+            raise RuntimeError(f"{workers} workers disagree with {worker_counts[0]} worker(s).")
+
+        results.append((workers, seconds, len(descriptions) / seconds if seconds > 0 else 0.0))
+
+    return results
+
+
+def main(argv):
+    # Imported here so the worker processes do not load pandas for it
+    from core.rule_analyzer import load_corpus
+
+    args, options = parse_args(argv)
+
+    rule_path = options.get("rules", "./rules/description_rules.json")
+    worker_counts = [
+        int(count)
+        for count in str(options.get("workers", f"1,{os.cpu_count() or 1}")).split(",")
+    ]
+    chunk_size = int(options.get("chunk_size", 5000))
+    repeat = int(options.get("repeat", 1))
+
+    corpus_files = []
+    for arg in args:
+        corpus_files.extend(expand_inputs(arg, [".xlsx"]))
+
+    if not corpus_files:
+        print("No corpus files given (bank_statement.xlsx or unclassified.xlsx exports).")
+        return
+
+    # --repeat multiplies a small corpus up to a size worth sharding
+    descriptions = load_corpus(corpus_files) * repeat
+    rule_engine = RuleEngine(rule_path)
+
+    print(f"Descriptions: {len(descriptions)}  Rules: {len(rule_engine.rules)}")
+
+    results = benchmark(rule_engine, descriptions, worker_counts, chunk_size)
+    base_seconds = results[0][1]
+
+    for workers, seconds, rate in results:
+        speedup = base_seconds / seconds if seconds > 0 else 0.0
+        print(f"  workers: {workers:>3}  time: {seconds:8.2f}s  rate: {rate:10.0f}/s  speedup: {speedup:5.2f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
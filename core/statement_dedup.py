@@ -0,0 +1,113 @@
+from extract.pdf_extractor import split_description_reference
+
+
+_MISSING_REFERENCES = {"", "nan", "none"}
+
+
+def _reference(txn):
+    # Camelot statements carry a reference column; for the rest fall back
+    # to the long numeric id inside the description.
+    reference = txn.reference.strip()
+    if reference.lower() in _MISSING_REFERENCES:
+        reference = split_description_reference(txn.description)[1]
+    return reference
+
+
+def duplicate_key(txn, ledger):
+    """
+    Hash-join key of a statement row, or None if the row has neither a
+    reference nor a printed balance: without either, two identical rows on
+    one day (two equal UPI payments) cannot be told apart from a repeat.
+    The running balance is not part of the key; it only decides which of
+    several rows sharing a key pair up (see StatementDeduplicator).
+    """
+
+    if not txn.date or txn.direction is None:
+        return None
+
+    reference = _reference(txn)
+    if not reference and txn.balance_paise is None:
+        return None
+
+    return (ledger, txn.date, txn.direction, txn.amount_paise, reference)
+
+
+class StatementDeduplicator:
+    """
+    Drops transactions that an earlier statement of the same batch already
+    produced, e.g. when a monthly and a quarterly download overlap.
+    Statements are fed in order; each key remembers the balances of its
+    rows in the earlier statement where it occurred most often, so genuine
+    repeats inside a statement survive and only the overlap is dropped.
+    When a key has several rows, rows pair up with an earlier row of the
+    same balance first and the rest in order. One dict lookup per row
+    keeps it linear over the whole batch.
+    """
+
+    def __init__(self, ledger):
+        self.ledger = ledger
+        self.seen = {}
+
+    def filter(self, transactions, source):
+        """
+        Returns the transactions to keep and report rows for the dropped ones.
+        """
+
+        groups = {}
+        for position, txn in enumerate(transactions):
+            key = duplicate_key(txn, self.ledger)
+            if key is not None:
+                groups.setdefault(key, []).append(position)
+
+        dropped = {}
+
+        for key, positions in groups.items():
+            first_source, earlier = self.seen.get(key, (None, []))
+            if not earlier:
+                continue
+
+            remaining = list(earlier)
+            unpaired = []
+
+            for position in positions:
+                balance = transactions[position].balance_paise
+                if balance is not None and balance in remaining:
+                    remaining.remove(balance)
+                    dropped[position] = first_source
+                else:
+                    unpaired.append(position)
+
+            # The balance cannot separate the rest; pair them in order
+            for position in unpaired[:len(remaining)]:
+                dropped[position] = first_source
+
+        for key, positions in groups.items():
+            first_source, earlier = self.seen.get(key, (source, []))
+            if len(positions) > len(earlier):
+                self.seen[key] = (
+                    first_source,
+                    [transactions[position].balance_paise for position in positions]
+                )
+
+        kept = []
+        duplicates = []
+
+        for position, txn in enumerate(transactions):
+            if position in dropped:
+                duplicates.append(self._report_row(txn, source, dropped[position]))
+            else:
+                kept.append(txn)
+
+        return kept, duplicates
+
+    def _report_row(self, txn, source, first_source):
+        return {
+            "Statement": source,
+            "First Seen In": first_source,
+            "Value Date": txn.date,
+            "Description": txn.description,
+            "Reference": _reference(txn),
+            "Withdrawal": txn.withdrawal,
+            "Deposit": txn.deposit,
+            "Balance": txn.balance_paise / 100 if txn.balance_paise is not None else None,
+        }
@@ -0,0 +1,122 @@
+import re
+
+from core.rule_engine import rule_patterns
+
+
+_REGEX_ESCAPES = re.compile(r"\\[A-Za-z]")
+_NON_WORD = re.compile(r"[^A-Z]+")
+
+# Directions a voucher type can book
+_DIRECTIONS = {
+    "Payment": {"OUT"},
+    "Receipt": {"IN"},
+    "Contra": {"IN", "OUT"},
+}
+
+
+def normalize_text(text):
+    # Letters only: reference numbers and amounts in descriptions differ on
+    # every row and would only add noise to the trigrams.
+    text = _REGEX_ESCAPES.sub(" ", str(text))
+    return " ".join(token for token in _NON_WORD.sub(" ", text.upper()).split() if len(token) > 1)
+
+
+def trigrams(text):
+    grams = set()
+    for token in text.split():
+        padded = f" {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class LedgerSuggester:
+    """
+    Suggests ledgers for unclassified transactions from an inverted index of
+    character trigrams over rule patterns, ledger names and descriptions
+    that were classified in this run.
+    Candidate blocking: a query only looks up its trigrams that occur in at
+    most max_df of the indexed texts, so common fragments ("UPI", "NEFT")
+    never pull in most of the index, and only texts sharing a rare trigram
+    are scored. Each candidate is then scored on its full trigram set (Dice
+    overlap), common trigrams included, so blocking only narrows down who
+    is scored and not the score itself.
+    """
+
+    def __init__(self, rules, classified=(), max_df=0.05, min_df_cap=20):
+        self.max_df = max_df
+        self.min_df_cap = min_df_cap
+        self.postings = {}
+        self.documents = []
+        self._seen = set()
+
+        for rule in rules:
+            target = (rule["ledger"], rule["voucher_type"])
+            self.add(rule["ledger"], target)
+            for pattern in rule_patterns(rule):
+                self.add(pattern, target)
+
+        self.add_classified(classified)
+
+    def add_classified(self, classified):
+        for description, ledger, voucher_type in classified:
+            self.add(description, (ledger, voucher_type))
+
+    def add(self, text, target):
+        text = normalize_text(text)
+        if not text or (text, target) in self._seen:
+            return
+
+        self._seen.add((text, target))
+
+        grams = trigrams(text)
+        doc_id = len(self.documents)
+        self.documents.append((target, frozenset(grams)))
+
+        for gram in grams:
+            self.postings.setdefault(gram, []).append(doc_id)
+
+    def suggest(self, description, direction=None, top_k=3, min_score=0.3):
+        """
+        Returns up to top_k (ledger, voucher_type, score) tuples, best first,
+        skipping voucher types that cannot book the given direction and
+        matches weaker than min_score.
+        """
+
+        grams = trigrams(normalize_text(description))
+        if not grams or not self.documents:
+            return []
+
+        df_cap = max(self.min_df_cap, int(self.max_df * len(self.documents)))
+
+        candidates = set()
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting and len(posting) <= df_cap:
+                candidates.update(posting)
+
+        best = {}
+        for doc_id in candidates:
+            target, doc_grams = self.documents[doc_id]
+            if direction and direction not in _DIRECTIONS.get(target[1], {direction}):
+                continue
+
+            score = 2 * len(grams & doc_grams) / (len(grams) + len(doc_grams))
+            if score >= min_score and score > best.get(target, 0.0):
+                best[target] = score
+
+        ranked = sorted(best.items(), key=lambda item: item[1], reverse=True)[:top_k]
+        return [(ledger, voucher_type, round(score, 2)) for (ledger, voucher_type), score in ranked]
+
+
+def classified_examples(vouchers, bank_ledger):
+    # (description, counter ledger, voucher type) of vouchers built this run
+    for voucher in vouchers:
+        ledger = voucher["Cr_Ledger"] if voucher["Dr_Ledger"] == bank_ledger else voucher["Dr_Ledger"]
+        yield voucher["Description"], ledger, voucher["Voucher_Type"]
+
+
+def format_suggestions(suggestions):
+    return "; ".join(
+        f"{ledger} ({voucher_type}, {score:.2f})"
+        for ledger, voucher_type, score in suggestions
+    )
@@ -1,49 +1,104 @@
 import pandas as pd
 
+from core.amounts import parse_amount, parse_amounts, to_paise, to_paise_array
+
 
 class Transaction:
     def __init__(self, row):
-        # --- Date handling (FINAL FIX) ---
-        raw_date = pd.to_datetime(
-            row.get("Value Date"),
-            errors="coerce",
-            dayfirst=False  # bank statement is yyyy-mm-dd
+        self._assign(
+            _format_date(row.get("Value Date")),
+            str(row.get("Description", "")).strip(),
+            str(row.get("Reference Number", "")).strip(),
+            to_paise(parse_amount(row.get("Withdrawals"), default=0)),
+            to_paise(parse_amount(row.get("Deposits"), default=0)),
+            to_paise(parse_amount(row.get("Running Balance"), default=None, dr_cr_suffix=True))
         )
 
-        if pd.notnull(raw_date):
-            self.date = raw_date.strftime("%d-%m-%Y")
-        else:
-            self.date = ""
+    @classmethod
+    def from_frame(cls, df):
+        """
+        Builds one Transaction per statement row, parsing the date and amount
+        columns once for the whole frame instead of row by row.
+        """
 
-        # --- Description ---
-        self.description = str(row.get("Description", "")).strip()
+        count = len(df)
+        dates = _format_date_column(df["Value Date"]) if "Value Date" in df.columns else [""] * count
+        descriptions = _text_column(df, "Description", count)
+        references = _text_column(df, "Reference Number", count)
+        withdrawals = _amount_column(df, "Withdrawals", count)
+        deposits = _amount_column(df, "Deposits", count)
+        balances = _balance_column(df, "Running Balance", count)
 
-        # --- Reference ---
-        self.reference = str(row.get("Reference Number", "")).strip()
+        transactions = []
+        for values in zip(dates, descriptions, references, withdrawals, deposits, balances):
+            txn = cls.__new__(cls)
+            txn._assign(*values)
+            transactions.append(txn)
 
-        # --- Amount Handling ---
-        withdrawal = row.get("Withdrawals")
-        deposit = row.get("Deposits")
+        return transactions
 
-        self.withdrawal = self._parse_amount(withdrawal)
-        self.deposit = self._parse_amount(deposit)
+    def _assign(self, date, description, reference, withdrawal_paise, deposit_paise, balance_paise=None):
+        # Amounts are held as integer paise; the rupee attributes are derived
+        # from them so keys, comparisons and totals never see float noise.
+        self.date = date
+        self.description = description
+        self.reference = reference
+        self.withdrawal_paise = withdrawal_paise
+        self.deposit_paise = deposit_paise
+        # Printed running balance, None when the statement row has none
+        self.balance_paise = balance_paise
 
-        if self.deposit > 0:
-            self.amount = self.deposit
+        if deposit_paise > 0:
+            self.amount_paise = deposit_paise
             self.direction = "IN"
-        elif self.withdrawal > 0:
-            self.amount = self.withdrawal
+        elif withdrawal_paise > 0:
+            self.amount_paise = withdrawal_paise
             self.direction = "OUT"
         else:
-            self.amount = 0
+            self.amount_paise = 0
             self.direction = None
 
-    def _parse_amount(self, value):
-        if pd.isna(value) or value == "":
-            return 0
+        self.withdrawal = withdrawal_paise / 100
+        self.deposit = deposit_paise / 100
+        self.amount = self.amount_paise / 100
+
+
+def _format_date(value):
+    raw_date = pd.to_datetime(
+        value,
+        errors="coerce",
+        dayfirst=False  # bank statement is yyyy-mm-dd
+    )
+
+    if pd.notnull(raw_date):
+        return raw_date.strftime("%d-%m-%Y")
+    return ""
+
+
+def _format_date_column(values):
+    # Statements repeat the same few dates; parse each distinct value once
+    codes, uniques = pd.factorize(values)
+    formatted = [_format_date(value) for value in uniques]
+    formatted.append("")  # factorize codes missing values as -1
+    return [formatted[code] for code in codes]
+
+
+def _text_column(df, column, count):
+    if column not in df.columns:
+        return [""] * count
+    return [str(value).strip() for value in df[column].to_numpy(dtype=object)]
+
+
+def _amount_column(df, column, count):
+    if column not in df.columns:
+        return [0] * count
+    return to_paise_array(parse_amounts(df[column], default=0)).tolist()
+
+
+def _balance_column(df, column, count):
+    if column not in df.columns:
+        return [None] * count
 
-        value = str(value).replace(",", "").strip()
-        try:
-            return float(value)
-        except ValueError:
-            return 0
+    balances = parse_amounts(df[column], default=None, dr_cr_suffix=True)
+    paise = to_paise_array(balances.fillna(0)).tolist()
+    return [value if known else None for value, known in zip(paise, balances.notna())]
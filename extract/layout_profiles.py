@@ -0,0 +1,60 @@
+import json
+import os
+
+from extract.pdf_extractor import (
+    AMOUNT_REGEX,
+    DATE_REGEX,
+    STANDARD_COLUMNS,
+    compile_line_patterns,
+    header_key,
+)
+
+
+PROFILE_PATH = "./rules/bank_profiles.json"
+
+
+def load_profile(bank, profile_path=PROFILE_PATH):
+    """
+    Loads the layout profile of a bank category (YES, SBI, ...) from
+    bank_profiles.json and precomputes what extraction needs from it.
+    Returns None when the bank has no profile, which keeps the generic
+    header inference.
+
+    Profile keys, all optional:
+      camelot           extra camelot.read_pdf options (flavor, table_areas, columns, ...)
+      header_signature  keywords the header row must contain for a table to be used
+      column_map        header text -> standard column name
+      text              date_regex / amount_regex for the text fallback
+    """
+
+    if not bank or not os.path.exists(profile_path):
+        return None
+
+    with open(profile_path, "r") as f:
+        profiles = json.load(f)
+
+    matches = [name for name in profiles if name.lower() == str(bank).lower()]
+    if not matches:
+        return None
+
+    name = matches[0]
+    raw = profiles[name]
+
+    column_map = {}
+    for header, column in raw.get("column_map", {}).items():
+        if column not in STANDARD_COLUMNS:
+            raise ValueError(f"Bank profile '{name}' maps '{header}' to unknown column '{column}'")
+        column_map[header_key(header)] = column
+
+    text = raw.get("text", {})
+
+    return {
+        "name": name,
+        "camelot": dict(raw.get("camelot", {})),
+        "header_signature": [header_key(keyword) for keyword in raw.get("header_signature", [])],
+        "column_map": column_map,
+        "line_patterns": compile_line_patterns(
+            text.get("date_regex", DATE_REGEX),
+            text.get("amount_regex", AMOUNT_REGEX)
+        ),
+    }
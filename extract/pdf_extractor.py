@@ -1,9 +1,19 @@
-import camelot
+import os
+import pickle
+import shutil
+import time
 import pandas as pd
 import re
-from openpyxl import load_workbook
-from openpyxl.worksheet.table import Table, TableStyleInfo
 
+from core import amounts
+from extract.pdf_source import PdfSource
+from extract.reconciliation import PAGE_COLUMN, print_reconciliation, reconcile_balances
+
+
+CHECKPOINT_DIR = "./output/.extract_checkpoints"
+
+# Seconds a fresh page worker may take to start; not part of --page-timeout
+WORKER_STARTUP_TIMEOUT = 120
 
 STANDARD_COLUMNS = [
     "Transaction Date",
@@ -16,6 +26,25 @@ STANDARD_COLUMNS = [
 ]
 
 
+# Text-layout statement lines: "01-JAN-2025 01-JAN-2025 <description> 0.00 10.00 110.00"
+DATE_REGEX = r"\d{2}-[A-Z]{3}-\d{4}"
+AMOUNT_REGEX = r"-?\d[\d,]*\.\d{2}"
+
+
+
+def compile_line_patterns(date_regex=DATE_REGEX, amount_regex=AMOUNT_REGEX):
+    line_pattern = re.compile(
+        rf"^({date_regex})\s+({date_regex})\s+(.*?)\s+({amount_regex})\s+({amount_regex})\s+({amount_regex})\s*$",
+        re.IGNORECASE
+    )
+    date_start_pattern = re.compile(rf"^{date_regex}", re.IGNORECASE)
+    return line_pattern, date_start_pattern
+
+
+TRANSACTION_LINE_PATTERN, DATE_START_PATTERN = compile_line_patterns()
+REFERENCE_PATTERN = re.compile(r"\b\d{6,}\b")
+
+
 # -----------------------------------------------------
 # Header Utilities
 # -----------------------------------------------------
@@ -30,6 +59,11 @@ def normalize_header(text):
     )
 
 
+def header_key(text):
+    # normalize_header with inner whitespace collapsed, for exact lookups
+    return " ".join(normalize_header(text).split())
+
+
 def map_column(col):
     col_lower = normalize_header(col)
 
@@ -120,25 +154,19 @@ def merge_spillover_rows(df):
 
 
 def parse_amount(value):
-    if pd.isna(value):
-        return 0.0
-
-    text = str(value).replace(",", "").strip()
-    if text == "" or text.lower() in {"nan", "none"}:
-        return 0.0
-
-    try:
-        return float(text)
-    except ValueError:
-        return 0.0
+    return amounts.parse_amount(value, default=0.0)
 
 
 def clean_text(value):
-    return re.sub(r"\s+", " ", str(value).replace("\n", " ")).strip()
+    # str.split() splits on the same whitespace as \s+ and skips empties
+    return " ".join(str(value).split())
 
 
 def is_header_line(line):
-    normalized = clean_text(line).upper()
+    return _is_clean_header_line(clean_text(line).upper())
+
+
+def _is_clean_header_line(normalized):
     return (
         "TXN DATE" in normalized and
         "VALUE DATE" in normalized and
@@ -151,25 +179,23 @@ def is_header_line(line):
 
 def split_description_reference(description):
     # Best-effort reference extraction from long numeric ids in description.
-    match = re.search(r"\b\d{6,}\b", description)
+    match = REFERENCE_PATTERN.search(description)
     reference = match.group(0) if match else ""
     return description, reference
 
 
 def parse_text_transaction_line(line):
-    date_regex = r"\d{2}-[A-Z]{3}-\d{4}"
-    amount_regex = r"-?\d[\d,]*\.\d{2}"
+    return _parse_clean_line(clean_text(line))
 
-    pattern = re.compile(
-        rf"^({date_regex})\s+({date_regex})\s+(.*?)\s+({amount_regex})\s+({amount_regex})\s+({amount_regex})\s*$",
-        re.IGNORECASE
-    )
 
-    match = pattern.match(clean_text(line))
+def _parse_clean_line(line, line_pattern=TRANSACTION_LINE_PATTERN):
+    match = line_pattern.match(line)
     if not match:
         return None
 
-    description, reference = split_description_reference(clean_text(match.group(3)))
+    # The line is already whitespace-normalised, so the description group
+    # needs no further cleaning.
+    description, reference = split_description_reference(match.group(3))
 
     return {
         "Transaction Date": match.group(1).upper(),
@@ -182,47 +208,78 @@ def parse_text_transaction_line(line):
     }
 
 
-def extract_text_statement(pdf_path):
-    try:
-        import pdfplumber
-    except ImportError:
-        print("pdfplumber is not installed. Text fallback unavailable.")
-        return pd.DataFrame(columns=STANDARD_COLUMNS)
+def parse_text_lines(numbered_lines, profile=None):
+    """
+    Turns (page number, line) pairs of a text-layout statement into
+    transaction dicts, each tagged with the page its first line is on.
+    Lines starting with a date open a transaction, other lines are
+    spillover description text of the open one.
+    A bank profile may supply its own date/amount patterns.
+    """
+
+    line_pattern, date_start_pattern = (
+        profile["line_patterns"] if profile else (TRANSACTION_LINE_PATTERN, DATE_START_PATTERN)
+    )
 
     transactions = []
     current_transaction = None
-    date_start_pattern = re.compile(r"^\d{2}-[A-Z]{3}-\d{4}", re.IGNORECASE)
 
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text() or ""
+    for page_number, raw_line in numbered_lines:
+        line = clean_text(raw_line)
 
-            for raw_line in text.splitlines():
-                line = clean_text(raw_line)
-
-                if line == "" or is_header_line(line):
-                    continue
+        if line == "":
+            continue
 
-                if date_start_pattern.match(line):
-                    parsed = parse_text_transaction_line(line)
-                    if not parsed:
-                        continue
+        # Cheap prefix check before the full transaction pattern
+        if date_start_pattern.match(line):
+            parsed = _parse_clean_line(line, line_pattern)
+            if not parsed:
+                continue
 
-                    if current_transaction:
-                        transactions.append(current_transaction)
+            if current_transaction:
+                transactions.append(current_transaction)
 
-                    current_transaction = parsed
-                elif current_transaction:
-                    # Non-date lines are treated as spillover description lines.
-                    current_transaction["Description"] = clean_text(
-                        f"{current_transaction['Description']} {line}"
-                    )
+            parsed[PAGE_COLUMN] = page_number
+            current_transaction = parsed
+        elif _is_clean_header_line(line.upper()):
+            continue
+        elif current_transaction:
+            # Non-date lines are treated as spillover description lines.
+            description = current_transaction["Description"]
+            current_transaction["Description"] = f"{description} {line}" if description else line
 
     if current_transaction:
         transactions.append(current_transaction)
 
+    return transactions
+
+
+def iter_text_lines(pdf, page_numbers=None):
+    """
+    Yields (page number, line) pairs of the text layer, for all pages or
+    only the given 1-based page numbers. Needs pdfplumber.
+    """
+
+    import pdfplumber
+
+    with pdfplumber.open(pdf, pages=page_numbers) as document:
+        for page in document.pages:
+            for line in (page.extract_text() or "").splitlines():
+                yield page.page_number, line
+
+
+def _pdfplumber_available():
+    try:
+        import pdfplumber  # noqa: F401
+    except ImportError:
+        print("pdfplumber is not installed. Text fallback unavailable.")
+        return False
+    return True
+
+
+def text_frame(transactions):
     if not transactions:
-        return pd.DataFrame(columns=STANDARD_COLUMNS)
+        return pd.DataFrame(columns=STANDARD_COLUMNS + [PAGE_COLUMN])
 
     df = pd.DataFrame(transactions)
 
@@ -230,10 +287,24 @@ def extract_text_statement(pdf_path):
         if column not in df.columns:
             df[column] = ""
 
-    df["Description"] = df["Description"].apply(clean_text)
-    df = df[STANDARD_COLUMNS]
+    return df[STANDARD_COLUMNS + [PAGE_COLUMN]]
 
-    return df
+
+def extract_text_pages(pdf, page_numbers=None, profile=None):
+    """
+    Text-layout extraction with pdfplumber, for all pages or only the given
+    1-based page numbers. pdf is a path or an open binary stream.
+    """
+
+    if not _pdfplumber_available():
+        return pd.DataFrame(columns=STANDARD_COLUMNS)
+
+    return text_frame(parse_text_lines(iter_text_lines(pdf, page_numbers), profile))
+
+
+def extract_text_statement(pdf_path, profile=None):
+    with PdfSource(pdf_path) as source, source.reader() as stream:
+        return extract_text_pages(stream, None, profile)
 
 
 def has_valid_transactions(df):
@@ -241,32 +312,46 @@ def has_valid_transactions(df):
     if df.empty or not required.issubset(set(df.columns)):
         return False
 
-    for _, row in df.iterrows():
-        description = clean_text(row.get("Description", ""))
-        withdrawal = parse_amount(row.get("Withdrawals"))
-        deposit = parse_amount(row.get("Deposits"))
+    descriptions = df["Description"].map(clean_text)
+    has_amount = (
+        (amounts.parse_amounts(df["Withdrawals"]) > 0)
+        | (amounts.parse_amounts(df["Deposits"]) > 0)
+    )
+    candidates = df[(descriptions != "") & has_amount]
 
+    for _, row in candidates.iterrows():
         txn_date = pd.to_datetime(row.get("Transaction Date"), errors="coerce")
         val_date = pd.to_datetime(row.get("Value Date"), errors="coerce")
 
-        if description and (withdrawal > 0 or deposit > 0) and pd.notna(txn_date) and pd.notna(val_date):
+        if pd.notna(txn_date) and pd.notna(val_date):
             return True
 
     return False
 
 
 # -----------------------------------------------------
-# Main Extraction Function
+# Table Extraction
 # -----------------------------------------------------
 
-def extract_bank_statement(pdf_path, output_file):
+def extract_table_pages(pdf_path, pages, profile=None):
+    """
+    Runs camelot on a page range ("1-10" or "all") and returns the tables
+    that look like transaction tables, mapped to STANDARD_COLUMNS.
+    A bank profile supplies camelot options, a header signature that
+    rejects non-transaction tables up front and a precomputed column map.
+    """
+
+    # camelot pulls in OpenCV and ghostscript bindings; import it only
+    # when a PDF is actually being extracted.
+    import camelot
 
-    tables = camelot.read_pdf(pdf_path, pages="all")
+    camelot_options = profile["camelot"] if profile else {}
+    signature = profile["header_signature"] if profile else []
+    column_map = profile["column_map"] if profile else {}
 
-    print(f"Total tables detected: {tables.n}")
+    tables = camelot.read_pdf(pdf_path, pages=pages, **camelot_options)
 
     dataframes = []
-    accepted_tables = 0
     ignored_tables = 0
 
     for table in tables:
@@ -277,14 +362,23 @@ def extract_bank_statement(pdf_path, output_file):
             ignored_tables += 1
             continue
 
+        headers = [header_key(col) for col in df.iloc[0]]
+
+        # Summary boxes and footers don't carry the bank's header row
+        if signature:
+            header_text = " ".join(headers)
+            if not all(keyword in header_text for keyword in signature):
+                ignored_tables += 1
+                continue
+
         # First row as header
         df.columns = df.iloc[0]
         df = df[1:]
 
-        # Dynamic column mapping
+        # Profile column map first, dynamic mapping for anything else
         mapped_columns = {}
-        for col in df.columns:
-            mapped = map_column(col)
+        for col, header in zip(df.columns, headers):
+            mapped = column_map.get(header) or map_column(col)
             if mapped:
                 mapped_columns[col] = mapped
 
@@ -310,41 +404,359 @@ def extract_bank_statement(pdf_path, output_file):
         if "Running Balance" not in df.columns:
             df["Running Balance"] = ""
 
-        # Standardize column order
-        df = df[STANDARD_COLUMNS]
+        # Standardize column order; keep the source page for reconciliation
+        df = df[STANDARD_COLUMNS].assign(**{PAGE_COLUMN: int(table.page)})
 
-        accepted_tables += 1
         dataframes.append(df)
 
-    final_df = pd.DataFrame()
+    return {
+        "tables": tables.n,
+        "dataframes": dataframes,
+        "ignored": ignored_tables,
+    }
 
-    if dataframes:
-        final_df = pd.concat(dataframes, ignore_index=True)
 
-        # Clean all cell values
-        for col in final_df.columns:
-            final_df[col] = (
-                final_df[col]
-                .astype(str)
-                .str.replace("\n", " ", regex=False)
-                .str.replace("\r", "", regex=False)
-                .str.replace(r"\s+", " ", regex=True)
-                .str.strip()
-            )
+# -----------------------------------------------------
+# Page Checkpoints
+# -----------------------------------------------------
 
-        # Repair merged columns
-        final_df = repair_merged_amounts(final_df)
+def page_ranges(page_count, pages_per_chunk):
+    if not page_count:
+        return ["all"]
 
-        # Merge multiline spillovers
-        final_df = merge_spillover_rows(final_df)
+    return [
+        f"{start}-{min(start + pages_per_chunk - 1, page_count)}"
+        for start in range(1, page_count + 1, pages_per_chunk)
+    ]
 
-    if not has_valid_transactions(final_df):
-        print("Switching to text-based extraction (pdfplumber fallback)...")
-        final_df = extract_text_statement(pdf_path)
+
+def page_numbers(pages):
+    start, _, end = pages.partition("-")
+    return list(range(int(start), int(end or start) + 1))
+
+
+def _worker_ready():
+    return True
+
+
+class PageWorker:
+    """
+    Runs extract_table_pages in a child process so a page range that hangs
+    camelot (ghostscript, line detection) can be abandoned after a timeout.
+    The child is killed and replaced on the next call.
+    """
+
+    def __init__(self):
+        self.pool = None
+
+    def start(self):
+        import multiprocessing
+
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(processes=1)
+            # Wait for the child to finish starting up (under spawn it
+            # re-imports the main module and pandas) so that time is not
+            # charged to the first page range's budget. A child that cannot
+            # start at all still gives up instead of hanging.
+            try:
+                self.pool.apply_async(_worker_ready).get(WORKER_STARTUP_TIMEOUT)
+            except multiprocessing.TimeoutError:
+                self.pool.terminate()
+                self.pool.join()
+                self.pool = None
+                raise
+
+    def run(self, args, timeout):
+        import multiprocessing
+
+        self.start()
+
+        result = self.pool.apply_async(extract_table_pages, args)
+
+        try:
+            return result.get(timeout)
+        except multiprocessing.TimeoutError:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+            raise
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+
+def extract_pages_bounded(worker, source, pages, profile, page_timeout):
+    """
+    Table extraction for one page range within page_timeout seconds.
+    If camelot times out or fails on the range, those pages alone are
+    parsed with the pdfplumber text fallback instead.
+    """
+
+    import multiprocessing
+
+    started = time.perf_counter()
+
+    try:
+        # A fresh child's start-up is neither part of the budget nor the timing
+        worker.start()
+    except multiprocessing.TimeoutError:
+        reason = f"page worker did not start within {WORKER_STARTUP_TIMEOUT}s"
+    else:
+        started = time.perf_counter()
+        try:
+            # camelot opens the file by path; the worker only receives the path
+            chunk = worker.run((source.path, pages, profile), page_timeout)
+        except multiprocessing.TimeoutError:
+            reason = f"timed out after {page_timeout}s"
+        except Exception as e:
+            reason = f"table extraction failed: {e}"
+        else:
+            chunk["degraded"] = None
+            chunk["seconds"] = time.perf_counter() - started
+            return chunk
+
+    numbers = page_numbers(pages) if pages != "all" else None
+    with source.reader() as stream:
+        df = extract_text_pages(stream, numbers, profile)
+
+    return {
+        "tables": 0,
+        "dataframes": [df] if not df.empty else [],
+        "ignored": 0,
+        "degraded": reason,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def extract_checkpointed(
+    source,
+    checkpoint_dir,
+    resume=False,
+    pages_per_chunk=10,
+    profile=None,
+    page_timeout=None
+):
+    """
+    Extracts the table pages chunk by chunk, saving each chunk's result in
+    checkpoint_dir. With resume=True, chunks already saved by an earlier,
+    interrupted run are loaded instead of re-extracted.
+    With page_timeout, every chunk runs under that time budget and falls
+    back to text parsing on its own if it exceeds it.
+    """
+
+    os.makedirs(checkpoint_dir, exist_ok=True)
+
+    chunks = []
+    worker = PageWorker() if page_timeout else None
+
+    try:
+        for pages in page_ranges(source.page_count, pages_per_chunk):
+            checkpoint_path = os.path.join(checkpoint_dir, f"pages_{pages}.pkl")
+
+            if resume and os.path.exists(checkpoint_path):
+                with open(checkpoint_path, "rb") as f:
+                    chunks.append(pickle.load(f))
+                print(f"Pages {pages}: restored from checkpoint")
+                continue
+
+            if worker:
+                chunk = extract_pages_bounded(worker, source, pages, profile, page_timeout)
+            else:
+                started = time.perf_counter()
+                chunk = extract_table_pages(source.path, pages, profile)
+                chunk["degraded"] = None
+                chunk["seconds"] = time.perf_counter() - started
+
+            chunk["pages"] = pages
+
+            with open(checkpoint_path, "wb") as f:
+                pickle.dump(chunk, f)
+
+            chunks.append(chunk)
+    finally:
+        if worker:
+            worker.close()
+
+    return chunks
+
+
+def extract_text_checkpointed(source, checkpoint_dir, resume=False, pages_per_chunk=10, profile=None):
+    """
+    Whole-document text fallback, read page range by page range with each
+    range's lines saved in checkpoint_dir, so an interrupted run resumes
+    from the last finished range like the table pass does.
+    The lines of all ranges are parsed together, so a transaction that
+    spills over a range boundary still gets its full description.
+    """
+
+    if not _pdfplumber_available():
+        return pd.DataFrame(columns=STANDARD_COLUMNS)
+
+    os.makedirs(checkpoint_dir, exist_ok=True)
+
+    lines = []
+
+    for pages in page_ranges(source.page_count, pages_per_chunk):
+        checkpoint_path = os.path.join(checkpoint_dir, f"text_{pages}.pkl")
+
+        if resume and os.path.exists(checkpoint_path):
+            with open(checkpoint_path, "rb") as f:
+                lines.extend(pickle.load(f))
+            print(f"Pages {pages}: text restored from checkpoint")
+            continue
+
+        numbers = page_numbers(pages) if pages != "all" else None
+        with source.reader() as stream:
+            range_lines = list(iter_text_lines(stream, numbers))
+
+        with open(checkpoint_path, "wb") as f:
+            pickle.dump(range_lines, f)
+
+        lines.extend(range_lines)
+
+    return text_frame(parse_text_lines(lines, profile))
+
+
+def print_degraded_pages(chunks):
+    degraded = [chunk for chunk in chunks if chunk.get("degraded")]
+    if not degraded:
+        return
+
+    print("Pages degraded to text extraction:")
+    for chunk in degraded:
+        print(f"  Pages {chunk['pages']}: {chunk['degraded']} ({chunk['seconds']:.1f}s)")
+
+
+# -----------------------------------------------------
+# Main Extraction Function
+# -----------------------------------------------------
+
+def extract_bank_statement(
+    pdf_path,
+    output_file,
+    resume=False,
+    pages_per_chunk=10,
+    profile=None,
+    page_timeout=None
+):
+
+    # One validated, memory-mapped read of the PDF serves the hash, the
+    # page count and every pdfplumber pass below.
+    with PdfSource(pdf_path) as source:
+        final_df, chunks, checkpoint_dir = extract_statement_frame(
+            source,
+            resume,
+            pages_per_chunk,
+            profile,
+            page_timeout
+        )
 
     if not has_valid_transactions(final_df):
         raise ValueError("No valid tables found in PDF. Extraction aborted.")
 
+    final_df.attrs["reconciliation"] = reconcile_balances(final_df)
+    # Rows lost in a degraded range can sit outside every balance check
+    final_df.attrs["degraded_pages"] = [chunk["pages"] for chunk in chunks if chunk.get("degraded")]
+
+    write_statement_table(final_df.drop(columns=PAGE_COLUMN, errors="ignore"), output_file)
+
+    # The statement is saved; the page checkpoints are no longer needed.
+    shutil.rmtree(checkpoint_dir, ignore_errors=True)
+
+    accepted_tables = sum(
+        len(chunk["dataframes"]) for chunk in chunks if not chunk.get("degraded")
+    )
+    ignored_tables = sum(chunk["ignored"] for chunk in chunks)
+
+    print(f"Tables accepted: {accepted_tables}")
+    print(f"Tables ignored : {ignored_tables}")
+    print_degraded_pages(chunks)
+    print_reconciliation(final_df.attrs["reconciliation"])
+    print("Bank statement extraction completed.")
+
+    return final_df
+
+
+def extract_statement_frame(source, resume, pages_per_chunk, profile, page_timeout):
+
+    # Checkpoints depend on the profile used to extract them
+    checkpoint_key = source.sha256
+    if profile:
+        checkpoint_key = f"{checkpoint_key}_{profile['name']}"
+
+    checkpoint_dir = os.path.join(CHECKPOINT_DIR, checkpoint_key)
+    chunks = extract_checkpointed(
+        source,
+        checkpoint_dir,
+        resume,
+        pages_per_chunk,
+        profile,
+        page_timeout
+    )
+
+    print(f"Total tables detected: {sum(chunk['tables'] for chunk in chunks)}")
+
+    # Whether the statement has tables at all is decided on camelot's own
+    # output: rows a degraded range got from the text parser must not stand
+    # in for the statement and suppress the whole-document fallback below.
+    table_frames = [
+        df
+        for chunk in chunks
+        if not chunk.get("degraded")
+        for df in chunk["dataframes"]
+    ]
+    final_df = stitch_tables(table_frames)
+
+    if not has_valid_transactions(final_df):
+        print("Switching to text-based extraction (pdfplumber fallback)...")
+        final_df = extract_text_checkpointed(source, checkpoint_dir, resume, pages_per_chunk, profile)
+
+    elif any(chunk.get("degraded") for chunk in chunks):
+        # Re-stitch with the degraded ranges' text rows in page order
+        final_df = stitch_tables([df for chunk in chunks for df in chunk["dataframes"]])
+
+    return final_df, chunks, checkpoint_dir
+
+
+def stitch_tables(dataframes):
+    """
+    Joins the per-range tables and cleans them as one frame. Chunks are
+    stitched in page order before cleaning, so spillover rows at the top of
+    a chunk still merge into the last row of the previous one.
+    """
+
+    if not dataframes:
+        return pd.DataFrame()
+
+    final_df = pd.concat(dataframes, ignore_index=True)
+
+    # Clean all cell values (the page column stays numeric)
+    for col in STANDARD_COLUMNS:
+        final_df[col] = (
+            final_df[col]
+            .astype(str)
+            .str.replace("\n", " ", regex=False)
+            .str.replace("\r", "", regex=False)
+            .str.replace(r"\s+", " ", regex=True)
+            .str.strip()
+        )
+
+    # Repair merged columns
+    final_df = repair_merged_amounts(final_df)
+
+    # Merge multiline spillovers
+    final_df = merge_spillover_rows(final_df)
+
+    return final_df
+
+
+def write_statement_table(final_df, output_file):
+    from openpyxl import load_workbook
+    from openpyxl.worksheet.table import Table, TableStyleInfo
+
     # Save Excel
     final_df.to_excel(output_file, index=False)
 
@@ -370,9 +782,3 @@ def extract_bank_statement(pdf_path, output_file):
     ws.add_table(excel_table)
 
     wb.save(output_file)
-
-    print(f"Tables accepted: {accepted_tables}")
-    print(f"Tables ignored : {ignored_tables}")
-    print("Bank statement extraction completed.")
-
-    return final_df
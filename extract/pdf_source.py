@@ -0,0 +1,57 @@
+import hashlib
+import mmap
+
+
+class PdfSource:
+    """
+    A PDF opened once through a read-only memory map.
+    The file is validated, hashed and page-counted in that single pass, and
+    the pdfplumber passes in this process read fresh maps of the same file
+    instead of copying it into memory again.
+    camelot (and the page worker running it) only gets the path and opens
+    the file on its own, so it does not share these maps.
+    """
+
+    def __init__(self, pdf_path):
+        self.path = pdf_path
+        self._file = open(pdf_path, "rb")
+
+        try:
+            self.buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"'{pdf_path}' is empty.")
+
+        if not self.buffer[:1024].lstrip().startswith(b"%PDF-"):
+            self.close()
+            raise ValueError(f"'{pdf_path}' is not a PDF file.")
+
+        self.sha256 = hashlib.sha256(self.buffer).hexdigest()
+        self.page_count = self._count_pages()
+
+    def _count_pages(self):
+        # pypdf ships with camelot (older releases use PyPDF2)
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            try:
+                from PyPDF2 import PdfReader
+            except ImportError:
+                return None
+
+        with self.reader() as stream:
+            return len(PdfReader(stream).pages)
+
+    def reader(self):
+        # A separate map keeps each reader's file position independent
+        return mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        self.buffer.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
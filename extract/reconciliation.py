@@ -0,0 +1,109 @@
+import numpy as np
+
+from core.amounts import format_paise, parse_amounts, to_paise_array
+
+
+PAGE_COLUMN = "_page"
+MAX_LISTED_BREAKS = 20
+
+
+def _order_breaks(balances, deltas, known, reverse):
+    # Between two rows with a printed balance, the balance must move by the
+    # net of every row in between. Cumulative sums give all of those nets at
+    # once: forward (oldest first) a row's balance includes its own amount,
+    # reverse (newest first) it includes the amounts above it instead.
+    running = np.cumsum(deltas)
+    if reverse:
+        running = running - deltas
+
+    balance_moves = np.diff(balances[known])
+    amount_moves = np.diff(running[known])
+
+    if reverse:
+        mismatch = -balance_moves != amount_moves
+        rows = known[:-1][mismatch]
+        expected = balances[known[1:]][mismatch] + amount_moves[mismatch]
+    else:
+        mismatch = balance_moves != amount_moves
+        rows = known[1:][mismatch]
+        expected = balances[known[:-1]][mismatch] + amount_moves[mismatch]
+
+    return rows, expected
+
+
+def reconcile_balances(df):
+    """
+    Checks every printed running balance against the previous printed
+    balance plus deposits minus withdrawals, in integer paise.
+    Both reading orders are tried (statements are printed oldest-first or
+    newest-first) and the one with fewer breaks is reported.
+    Rows without a printed balance are carried into the next check.
+    """
+
+    deposits = to_paise_array(parse_amounts(df["Deposits"], default=0))
+    withdrawals = to_paise_array(parse_amounts(df["Withdrawals"], default=0))
+    deltas = deposits - withdrawals
+
+    printed = parse_amounts(df["Running Balance"], default=None, dr_cr_suffix=True)
+    known = np.flatnonzero(printed.notna().to_numpy())
+    balances = to_paise_array(printed.fillna(0))
+
+    report = {"rows": len(df), "checked": max(len(known) - 1, 0), "order": "oldest first", "breaks": []}
+
+    if len(known) < 2:
+        report["clean"] = False
+        return report
+
+    rows, expected = _order_breaks(balances, deltas, known, reverse=False)
+    reverse_rows, reverse_expected = _order_breaks(balances, deltas, known, reverse=True)
+
+    if len(reverse_rows) < len(rows):
+        rows, expected = reverse_rows, reverse_expected
+        report["order"] = "newest first"
+
+    pages = df[PAGE_COLUMN].to_numpy() if PAGE_COLUMN in df.columns else None
+
+    report["breaks"] = [
+        {
+            "row": int(row),
+            "page": _page_label(pages[row]) if pages is not None else None,
+            "expected_paise": int(expected_paise),
+            "balance_paise": int(balances[row]),
+        }
+        for row, expected_paise in zip(rows, expected)
+    ]
+    report["clean"] = not report["breaks"]
+
+    return report
+
+
+def _page_label(page):
+    if page is None or page != page:
+        return None
+    return int(page)
+
+
+def print_reconciliation(report):
+    if report["checked"] == 0:
+        print("Balance reconciliation: no running balances to check.")
+        return
+
+    if report["clean"]:
+        print(f"Balance reconciliation: {report['checked']} balances match ({report['order']}).")
+        return
+
+    breaks = report["breaks"]
+    print(f"Balance reconciliation: {len(breaks)} of {report['checked']} balances break ({report['order']}):")
+
+    for entry in breaks[:MAX_LISTED_BREAKS]:
+        # Statement rows are 1-based below the header row
+        location = f"row {entry['row'] + 2}"
+        if entry["page"] is not None:
+            location += f", page {entry['page']}"
+        print(
+            f"  {location}: expected {format_paise(entry['expected_paise'])}, "
+            f"statement shows {format_paise(entry['balance_paise'])}"
+        )
+
+    if len(breaks) > MAX_LISTED_BREAKS:
+        print(f"  ... and {len(breaks) - MAX_LISTED_BREAKS} more")
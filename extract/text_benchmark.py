@@ -0,0 +1,98 @@
+import sys
+import time
+
+from extract.pdf_extractor import parse_text_lines
+from utils.cli import parse_args
+
+
+# -----------------------------------------------------
+# Text fallback micro-benchmark
+# -----------------------------------------------------
+# python -m extract.text_benchmark [--lines=200000] [--lines-per-page=45]
+#     [--spillover-every=3] [--repeat=3]
+
+_MONTHS = ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"]
+
+_HEADER_LINE = "Txn Date  Value Date  Description  Debits  Credits  Balance"
+
+_DESCRIPTIONS = [
+    "UPI/P2A/{n:012d}/RAMESH  TRADERS/Payment",
+    "NEFT   {n:012d} HAREESH ENTERPRISES",
+    "IMPS/{n:012d}/SBI 79382",
+    "ATM WDL {n:06d} HYDERABAD",
+]
+
+
+def synthetic_lines(count, lines_per_page=45, spillover_every=3):
+    """
+    Returns count (page number, line) pairs laid out like a pdfplumber text
+    statement: a header line at the top of every page, transaction lines
+    with irregular spacing, and a spillover description line after every
+    spillover_every-th transaction.
+    """
+
+    lines = []
+    balance = 5_000_000.0
+    n = 0
+
+    while len(lines) < count:
+        page = len(lines) // lines_per_page + 1
+
+        if len(lines) % lines_per_page == 0:
+            lines.append((page, _HEADER_LINE))
+            continue
+
+        amount = 100 + (n * 37) % 90_000
+        deposit = n % 4 == 0
+        balance += amount if deposit else -amount
+        date = f"{n % 28 + 1:02d}-{_MONTHS[n // 28 % 12]}-2024"
+
+        lines.append((
+            page,
+            f"{date}  {date}   {_DESCRIPTIONS[n % len(_DESCRIPTIONS)].format(n=n)}  "
+            f"{0 if deposit else amount:,.2f}   {amount if deposit else 0:,.2f}  {balance:,.2f}"
+        ))
+
+        if spillover_every and n % spillover_every == 0 and len(lines) < count:
+            lines.append((page, f"   REF  {n:08d}  BRANCH  HYDERABAD  "))
+
+        n += 1
+
+    return lines[:count]
+
+
+def benchmark(lines, repeat=3, profile=None):
+    """
+    Parses the same lines repeat times and returns the best run as
+    (transactions, seconds, lines per second).
+    """
+
+    best = None
+    transactions = []
+
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        transactions = parse_text_lines(lines, profile)
+        seconds = time.perf_counter() - started
+        best = seconds if best is None else min(best, seconds)
+
+    return len(transactions), best, len(lines) / best if best > 0 else 0.0
+
+
+def main(argv):
+    _, options = parse_args(argv)
+
+    count = int(options.get("lines", 200_000))
+    lines_per_page = int(options.get("lines_per_page", 45))
+    spillover_every = int(options.get("spillover_every", 3))
+    repeat = int(options.get("repeat", 3))
+
+    lines = synthetic_lines(count, lines_per_page, spillover_every)
+    transactions, seconds, rate = benchmark(lines, repeat)
+
+    print(f"Lines: {len(lines)}  Transactions: {transactions}")
+    print(f"  best of {repeat}: {seconds:8.3f}s  rate: {rate:10.0f} lines/s")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
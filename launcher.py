@@ -2,8 +2,6 @@ import os
 import sys
 import subprocess
 import msvcrt
-import tkinter as tk
-from tkinter import filedialog
 
 
 BANK_CATEGORIES = {
@@ -42,24 +40,34 @@ def clear():
     os.system("cls")
 
 
-def select_file():
+def ask_open_filename(title, filetypes):
+    # tkinter is only needed once a file dialog is shown, so the menus
+    # render without paying for the Tk import.
+    import tkinter as tk
+    from tkinter import filedialog
+
     root = tk.Tk()
     root.withdraw()
     file_path = filedialog.askopenfilename(
-        title="Select Bank Statement PDF",
-        filetypes=[("PDF Files", "*.pdf")]
+        title=title,
+        filetypes=filetypes
     )
+    root.destroy()
     return file_path
 
 
+def select_file():
+    return ask_open_filename(
+        "Select Bank Statement PDF",
+        [("PDF Files", "*.pdf")]
+    )
+
+
 def select_sales_file():
-    root = tk.Tk()
-    root.withdraw()
-    file_path = filedialog.askopenfilename(
-        title="Select Sales Excel File",
-        filetypes=[("Excel Files", "*.xlsx *.xls")]
+    return ask_open_filename(
+        "Select Sales Excel File",
+        [("Excel Files", "*.xlsx *.xls")]
     )
-    return file_path
 
 
 def read_menu_choice(max_option, allow_back=False):
@@ -169,7 +177,10 @@ def main():
                 print(f"\nSelected Bank: {bank_ledger}")
                 print(f"Selected File: {file_path}")
                 print("\nProcessing...\n")
-                subprocess.run(["python", "main.py", file_path, bank_ledger])
+                subprocess.run([
+                    "python", "main.py", file_path, bank_ledger,
+                    f"--bank={category}"
+                ])
                 return
 
 
@@ -1,35 +1,105 @@
+import json
+import math
+import os
 import sys
 import pandas as pd
 
+from extract.layout_profiles import load_profile
 from extract.pdf_extractor import extract_bank_statement
 from core.transaction import Transaction
 from core.rule_engine import RuleEngine
 from core.builders import ContraBuilder, PaymentBuilder, ReceiptBuilder
+from core.amounts import format_paise, to_paise_array
 from core.engine import VoucherEngine
-from utils.file_writer import safe_excel_write
+from core.incremental import (
+    IncrementalClassifier,
+    file_hash,
+    load_state,
+    save_state,
+    transaction_keys,
+)
+from core.pipeline import Stage, StageFailure, StagedPipeline
+from core.sharded_classifier import ShardedClassifier
+from core.statement_dedup import StatementDeduplicator
+from core.suggestions import LedgerSuggester, classified_examples, format_suggestions
+from utils.cli import expand_inputs, parse_args
+from utils.file_reader import iter_excel_rows
+from utils.file_writer import StreamingExcelWriter, remove_stale_output, safe_excel_write
+from utils.profiling import StageProfiler
+from utils.shard_writer import SHARD_KEYS, VOUCHER_SHEETS, clear_shards, plan_shards, write_shards
 
 
 # -------- Runtime Arguments --------
-if len(sys.argv) > 1:
-    PDF_PATH = sys.argv[1]
+ARGS, OPTIONS = parse_args(sys.argv[1:])
+
+if len(ARGS) > 0:
+    PDF_PATH = ARGS[0]
 else:
     PDF_PATH = "./input/Statements/Nov_Statement.pdf"
 
-if len(sys.argv) > 2:
-    BANK_LEDGER = sys.argv[2]
+if len(ARGS) > 1:
+    BANK_LEDGER = ARGS[1]
 else:
     BANK_LEDGER = "494"
 
-if len(sys.argv) > 3:
-    DUPLICATE_JSON_PATH = sys.argv[3]
+if len(ARGS) > 2:
+    DUPLICATE_JSON_PATH = ARGS[2]
 else:
     DUPLICATE_JSON_PATH = None
 
+# --bank=<category> (passed by the launcher) selects a layout profile
+# from rules/bank_profiles.json
+BANK_PROFILE = load_profile(OPTIONS.get("bank"))
+
+# --batch treats PDF_PATH as a directory or glob of statements.
+BATCH_MODE = bool(OPTIONS.get("batch"))
+# Single-statement options the batch pipeline does not implement
+BATCH_UNSUPPORTED = ["incremental", "chunk_size", "classify_workers", "profile"]
+EXTRACT_WORKERS = int(OPTIONS.get("workers", 2))
+
+# --shard-by=ledger,month and/or --max-rows=N split the voucher output
+# into several workbooks under ./output/shards/ with a manifest.json
+SHARD_BY = [
+    key for key in str(OPTIONS.get("shard_by", "")).split(",")
+    if key in SHARD_KEYS
+]
+MAX_ROWS = int(OPTIONS["max_rows"]) if "max_rows" in OPTIONS else None
+
+# --resume picks up page checkpoints left by an interrupted extraction
+RESUME = bool(OPTIONS.get("resume"))
+
+# --page-timeout=SECONDS bounds camelot per page range (default 300s); a
+# range that runs over falls back to text parsing. --page-timeout=0 runs
+# camelot in-process without a bound. --pages-per-chunk sets the range size.
+PAGE_TIMEOUT = float(OPTIONS.get("page_timeout", 300)) or None
+PAGES_PER_CHUNK = int(OPTIONS.get("pages_per_chunk", 10))
+
+# --chunk-size=N streams the statement through classification and the
+# writers N rows at a time instead of holding it all in memory
+CHUNK_SIZE = int(OPTIONS["chunk_size"]) if "chunk_size" in OPTIONS else None
+# Whole-statement options the chunked writers do not implement
+CHUNKED_UNSUPPORTED = ["incremental", "shard_by", "max_rows"]
+
+# --incremental re-uses the previous run's extraction and rule assignments
+INCREMENTAL = bool(OPTIONS.get("incremental"))
+
+# --classify-workers=N matches rules in N processes (large re-classification runs)
+CLASSIFY_WORKERS = int(OPTIONS["classify_workers"]) if "classify_workers" in OPTIONS else None
+
+# --suggestions=K lists the K closest ledgers next to each unclassified row (0 = off)
+SUGGESTIONS = int(OPTIONS.get("suggestions", 3))
+
+# --profile reports time and peak memory per stage
+PROFILER = StageProfiler(enabled=bool(OPTIONS.get("profile")))
+
+OUTPUT_DIR = "./output"
 EXCEL_PATH = "./output/bank_statement.xlsx"
 FINAL_OUTPUT = "./output/statement_import_ready.xlsx"
 UNCLASSIFIED_OUTPUT = "./output/unclassified.xlsx"
 DUPLICATE_OUTPUT = "./output/duplicate_entries.xlsx"
-RULE_PATH = "./rules/description_rules.json"
+# --rules can point at a pruned set produced by core.rule_analyzer
+RULE_PATH = OPTIONS.get("rules", "./rules/description_rules.json")
+STATE_PATH = "./output/.incremental_state.json"
 
 
 def confirm_step(message):
@@ -40,111 +110,545 @@ def confirm_step(message):
     return choice == "y"
 
 
-def main():
+def output_paths(output_dir):
+    return {
+        "statement": os.path.join(output_dir, os.path.basename(EXCEL_PATH)),
+        "final": os.path.join(output_dir, os.path.basename(FINAL_OUTPUT)),
+        "unclassified": os.path.join(output_dir, os.path.basename(UNCLASSIFIED_OUTPUT)),
+        "duplicate": os.path.join(output_dir, os.path.basename(DUPLICATE_OUTPUT)),
+    }
 
-    # 1️⃣ Extract Bank Statement
-    safe_excel_write(
-        lambda: extract_bank_statement(PDF_PATH, EXCEL_PATH),
-        EXCEL_PATH
-    )
 
-    print("\nBank statement generated successfully.")
-    
-    # 2️⃣ Human Confirmation Step
-    if not confirm_step("Please review the generated bank_statement.xlsx file before proceeding."):
-        print("\nProcess stopped by user after bank statement generation.")
-        return
+def output_options():
+    # Options that change the written files but not the rule assignments
+    return {"suggestions": SUGGESTIONS, "shard_by": SHARD_BY, "max_rows": MAX_ROWS}
 
-    # 3️⃣ Load statement
-    df = pd.read_excel(EXCEL_PATH)
-    transactions = [Transaction(row) for _, row in df.iterrows()]
 
-    # 4️⃣ Setup rule engine
-    rule_engine = RuleEngine(RULE_PATH)
+def output_hashes(paths):
+    """
+    Hashes of the output files currently on disk (None for a missing one),
+    including every shard listed in the manifest, so an incremental run can
+    tell whether they are still the ones it wrote.
+    """
+
+    files = {name: paths[name] for name in ("final", "unclassified", "duplicate")}
+
+    shard_dir = os.path.join(os.path.dirname(paths["final"]), "shards")
+    manifest_path = os.path.join(shard_dir, "manifest.json")
+    files["manifest"] = manifest_path
+
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r") as f:
+            for shard in json.load(f):
+                files[shard["file"]] = os.path.join(shard_dir, shard["file"])
+
+    return {
+        name: file_hash(path) if os.path.exists(path) else None
+        for name, path in files.items()
+    }
+
 
+def build_engine(rule_engine):
     builder_registry = {
         "Contra": ContraBuilder(BANK_LEDGER),
         "Payment": PaymentBuilder(BANK_LEDGER),
         "Receipt": ReceiptBuilder(BANK_LEDGER)
     }
 
-    engine = VoucherEngine(
+    return VoucherEngine(
         rule_engine,
         builder_registry,
         duplicate_json_path=DUPLICATE_JSON_PATH
     )
 
-    # 5️⃣ Process transactions
-    vouchers = engine.process(transactions)
 
+def build_suggester(rule_engine, vouchers):
+    if not SUGGESTIONS:
+        return None
+    return LedgerSuggester(rule_engine.rules, classified_examples(vouchers, BANK_LEDGER))
+
+
+def unclassified_frame(transactions, suggester=None):
+    rows = []
+
+    for txn in transactions:
+        row = {
+            "Value Date": txn.date,
+            "Description": txn.description,
+            "Withdrawal": txn.withdrawal,
+            "Deposit": txn.deposit,
+            "Reference": txn.reference
+        }
+
+        if suggester:
+            row["Suggested Ledgers"] = format_suggestions(
+                suggester.suggest(txn.description, txn.direction, SUGGESTIONS)
+            )
+
+        rows.append(row)
+
+    return pd.DataFrame(rows)
+
+
+def voucher_totals(df_output):
+    """
+    Exact totals in integer paise per voucher type and counter ledger (the
+    side that is not the bank).
+    """
+
+    ledgers = df_output["Dr_Ledger"].where(
+        df_output["Dr_Ledger"] != BANK_LEDGER,
+        df_output["Cr_Ledger"]
+    )
+    paise = pd.Series(to_paise_array(df_output["Amount"]), index=df_output.index)
+
+    return paise.groupby([df_output["Voucher_Type"], ledgers]).sum()
+
+
+def print_totals(totals):
+    if totals.empty:
+        return
+
+    print("\nVoucher totals:")
+    for voucher_type, type_totals in totals.groupby(level=0):
+        print(f"  {voucher_type}: {format_paise(type_totals.sum())}")
+        for (_, ledger), paise in type_totals.items():
+            print(f"    {ledger}: {format_paise(paise)}")
+
+
+def write_outputs(vouchers, engine, paths, statement_duplicates=None):
     df_output = pd.DataFrame(vouchers)
+    shard_dir = os.path.join(os.path.dirname(paths["final"]), "shards")
+    stem = os.path.splitext(os.path.basename(paths["final"]))[0]
 
-    if not df_output.empty:
+    if not df_output.empty and (SHARD_BY or MAX_ROWS):
+        shards = plan_shards(df_output, BANK_LEDGER, SHARD_BY, MAX_ROWS)
+        manifest_path = write_shards(shards, shard_dir, stem)
+        # An unsharded file from an earlier run would be imported twice
+        remove_stale_output(paths["final"])
+
+        print(f"\nVoucher files generated successfully: {len(shards)} shards.")
+        print(f"Manifest: {manifest_path}")
 
-        payments_df = df_output[df_output["Voucher_Type"] == "Payment"].copy()
-        receipts_df = df_output[df_output["Voucher_Type"] == "Receipt"].copy()
-        contra_df = df_output[df_output["Voucher_Type"] == "Contra"].copy()
+    elif not df_output.empty:
+
+        # Shards from an earlier sharded run would be imported twice
+        clear_shards(shard_dir, stem)
 
         def write_voucher_file():
-            with pd.ExcelWriter(FINAL_OUTPUT, engine="openpyxl") as writer:
+            # Streamed one voucher type at a time, so only one sub-frame
+            # and no cell objects are held besides df_output
+            writer = StreamingExcelWriter(paths["final"])
 
-                if not payments_df.empty:
-                    payments_df.reset_index(drop=True, inplace=True)
-                    payments_df.insert(0, "Voucher_Num", payments_df.index + 1)
-                    payments_df.to_excel(writer, sheet_name="Payment", index=False)
+            for voucher_type in VOUCHER_SHEETS:
+                type_df = df_output[df_output["Voucher_Type"] == voucher_type].reset_index(drop=True)
+                if type_df.empty:
+                    continue
 
-                if not receipts_df.empty:
-                    receipts_df.reset_index(drop=True, inplace=True)
-                    receipts_df.insert(0, "Voucher_Num", receipts_df.index + 1)
-                    receipts_df.to_excel(writer, sheet_name="Receipt", index=False)
+                type_df.insert(0, "Voucher_Num", type_df.index + 1)
+                writer.append_frame(voucher_type, type_df)
 
-                if not contra_df.empty:
-                    contra_df.reset_index(drop=True, inplace=True)
-                    contra_df.insert(0, "Voucher_Num", contra_df.index + 1)
-                    contra_df.to_excel(writer, sheet_name="Contra", index=False)
+            writer.close()
 
-        safe_excel_write(write_voucher_file, FINAL_OUTPUT)
+        safe_excel_write(write_voucher_file, paths["final"])
 
         print("\nVoucher file generated successfully.")
 
     else:
         print("\nNo vouchers generated.")
 
+    if not df_output.empty:
+        print_totals(voucher_totals(df_output))
+
     # 6️⃣ Export Unclassified
-    if engine.duplicates:
+    if engine.duplicates or statement_duplicates:
         duplicate_df = pd.DataFrame(engine.duplicates).copy()
         duplicate_df.reset_index(drop=True, inplace=True)
-        duplicate_df.insert(0, "Voucher_Num", duplicate_df.index + 1)
+        if engine.duplicates:
+            duplicate_df.insert(0, "Voucher_Num", duplicate_df.index + 1)
 
-        safe_excel_write(
-            lambda: duplicate_df.to_excel(DUPLICATE_OUTPUT, index=False),
-            DUPLICATE_OUTPUT
-        )
+        def write_duplicate_file():
+            with pd.ExcelWriter(paths["duplicate"], engine="openpyxl") as writer:
+                if engine.duplicates:
+                    duplicate_df.to_excel(writer, sheet_name="Sheet1", index=False)
+                if statement_duplicates:
+                    pd.DataFrame(statement_duplicates).to_excel(
+                        writer, sheet_name="Statement Duplicates", index=False
+                    )
 
-        print(f"\nDuplicate contra vouchers skipped: {len(engine.duplicates)}")
+        safe_excel_write(write_duplicate_file, paths["duplicate"])
+
+        if engine.duplicates:
+            print(f"\nDuplicate contra vouchers skipped: {len(engine.duplicates)}")
+        if statement_duplicates:
+            print(f"\nRows already in an earlier statement of the batch: {len(statement_duplicates)}")
 
     if engine.unclassified:
 
-        unclassified_data = [
-            {
-                "Value Date": txn.date,
-                "Description": txn.description,
-                "Withdrawal": txn.withdrawal,
-                "Deposit": txn.deposit,
-                "Reference": txn.reference
-            }
-            for txn in engine.unclassified
-        ]
-
-        safe_excel_write(
-            lambda: pd.DataFrame(unclassified_data).to_excel(
-                UNCLASSIFIED_OUTPUT, index=False
-            ),
-            UNCLASSIFIED_OUTPUT
-        )
+        suggester = build_suggester(engine.rule_engine, vouchers)
+        unclassified_df = unclassified_frame(engine.unclassified, suggester)
+
+        def write_unclassified_file():
+            writer = StreamingExcelWriter(paths["unclassified"])
+            writer.append_frame("Sheet1", unclassified_df)
+            writer.close()
+
+        safe_excel_write(write_unclassified_file, paths["unclassified"])
 
         print(f"\nUnclassified transactions: {len(engine.unclassified)}")
+    else:
+        remove_stale_output(paths["unclassified"])
+
+
+# -------- Chunked Mode --------
+
+def run_chunked(statement_path, paths, chunk_size):
+    rule_engine = RuleEngine(RULE_PATH)
+    engine = build_engine(rule_engine)
+    classifier = None
+    if CLASSIFY_WORKERS:
+        # Split every chunk across all workers; the default shard size would
+        # keep chunks of that size or smaller in one process.
+        shard_size = max(1, math.ceil(chunk_size / CLASSIFY_WORKERS))
+        classifier = ShardedClassifier(rule_engine, CLASSIFY_WORKERS, shard_size)
+    # Learns from each chunk's vouchers before suggesting for its leftovers
+    suggester = build_suggester(rule_engine, [])
+
+    voucher_writer = StreamingExcelWriter(paths["final"])
+    duplicate_writer = StreamingExcelWriter(paths["duplicate"])
+    unclassified_writer = StreamingExcelWriter(paths["unclassified"])
+
+    # Voucher numbers continue from one chunk to the next
+    counters = {voucher_type: 0 for voucher_type in VOUCHER_SHEETS}
+    duplicate_count = 0
+    unclassified_count = 0
+    chunk_totals = []
+
+    for rows in iter_excel_rows(statement_path, chunk_size):
+        transactions = Transaction.from_frame(pd.DataFrame(rows))
+        matched_rules = classifier.match_all(transactions) if classifier else None
+        df_output = pd.DataFrame(engine.process(transactions, matched_rules))
+
+        if not df_output.empty:
+            chunk_totals.append(voucher_totals(df_output))
+
+        for voucher_type in VOUCHER_SHEETS:
+            if df_output.empty:
+                break
+
+            type_df = df_output[df_output["Voucher_Type"] == voucher_type].reset_index(drop=True)
+            if type_df.empty:
+                continue
+
+            type_df.insert(0, "Voucher_Num", type_df.index + counters[voucher_type] + 1)
+            counters[voucher_type] += len(type_df)
+            voucher_writer.append_frame(voucher_type, type_df)
+
+        if engine.duplicates:
+            duplicate_df = pd.DataFrame(engine.duplicates)
+            duplicate_df.insert(0, "Voucher_Num", duplicate_df.index + duplicate_count + 1)
+            duplicate_count += len(duplicate_df)
+            duplicate_writer.append_frame("Sheet1", duplicate_df)
+            engine.duplicates.clear()
+
+        if suggester and not df_output.empty:
+            suggester.add_classified(classified_examples(df_output.to_dict("records"), BANK_LEDGER))
+
+        if engine.unclassified:
+            unclassified_count += len(engine.unclassified)
+            unclassified_writer.append_frame(
+                "Sheet1",
+                unclassified_frame(engine.unclassified, suggester)
+            )
+            engine.unclassified.clear()
+
+    if classifier:
+        classifier.close()
+
+    if voucher_writer.sheets:
+        safe_excel_write(voucher_writer.close, paths["final"])
+        print("\nVoucher file generated successfully.")
+        print_totals(pd.concat(chunk_totals).groupby(level=[0, 1]).sum())
+    else:
+        print("\nNo vouchers generated.")
+
+    if duplicate_count:
+        safe_excel_write(duplicate_writer.close, paths["duplicate"])
+        print(f"\nDuplicate contra vouchers skipped: {duplicate_count}")
+
+    if unclassified_count:
+        safe_excel_write(unclassified_writer.close, paths["unclassified"])
+        print(f"\nUnclassified transactions: {unclassified_count}")
+    else:
+        remove_stale_output(paths["unclassified"])
+
+
+# -------- Batch Pipeline --------
+# extract (process pool) -> classify (thread) -> write (thread)
+
+def _extract_job(job):
+    os.makedirs(job["output_dir"], exist_ok=True)
+    final_df = extract_bank_statement(
+        job["pdf_path"],
+        job["paths"]["statement"],
+        resume=RESUME,
+        pages_per_chunk=PAGES_PER_CHUNK,
+        profile=BANK_PROFILE,
+        page_timeout=PAGE_TIMEOUT
+    )
+    # Batch mode has no review step; the checks go back for the summary
+    job["reconciliation"] = final_df.attrs["reconciliation"]
+    job["degraded_pages"] = final_df.attrs["degraded_pages"]
+    return job
+
+
+def _classify_job(job, rule_engine, deduplicator):
+    df = pd.read_excel(job["paths"]["statement"])
+    transactions = Transaction.from_frame(df)
+
+    # The classify stage sees statements one at a time in input order, so
+    # the earliest statement keeps an overlapping row.
+    transactions, job["statement_duplicates"] = deduplicator.filter(
+        transactions,
+        os.path.basename(job["pdf_path"])
+    )
+
+    engine = build_engine(rule_engine)
+    job["vouchers"] = engine.process(transactions)
+    job["engine"] = engine
+    return job
+
+
+def _write_job(job):
+    print(f"\n--- {os.path.basename(job['pdf_path'])} ---")
+    write_outputs(
+        job.pop("vouchers"),
+        job.pop("engine"),
+        job["paths"],
+        job.pop("statement_duplicates")
+    )
+    return job
+
+
+def review_reasons(job):
+    reasons = []
+
+    report = job["reconciliation"]
+    if report["checked"] == 0:
+        reasons.append("no running balances to check")
+    elif not report["clean"]:
+        reasons.append(f"{len(report['breaks'])} of {report['checked']} balances break")
+
+    if job["degraded_pages"]:
+        reasons.append(f"pages {', '.join(job['degraded_pages'])} degraded to text extraction")
+
+    return reasons
+
+
+def print_review_summary(jobs):
+    # Listed together at the end, since each statement's own reconciliation
+    # output is interleaved with the other workers'
+    flagged = [(job, review_reasons(job)) for job in jobs]
+    flagged = [(job, reasons) for job, reasons in flagged if reasons]
+
+    if not flagged:
+        print("\nAll statements reconcile.")
+        return
+
+    print("\nStatements to review:")
+    for job, reasons in flagged:
+        print(f"  {os.path.basename(job['pdf_path'])}: {'; '.join(reasons)}")
+
+
+def run_batch(pdf_paths):
+    if not pdf_paths:
+        print("\nNo statement PDFs found.")
+        return
+
+    rule_engine = RuleEngine(RULE_PATH)
+    deduplicator = StatementDeduplicator(BANK_LEDGER)
+
+    jobs = []
+    for pdf_path in pdf_paths:
+        stem = os.path.splitext(os.path.basename(pdf_path))[0]
+        output_dir = os.path.join(OUTPUT_DIR, stem)
+        jobs.append({
+            "pdf_path": pdf_path,
+            "output_dir": output_dir,
+            "paths": output_paths(output_dir),
+        })
+
+    print(f"Processing {len(jobs)} statements (review step skipped in batch mode)...")
+
+    pipeline = StagedPipeline(
+        [
+            Stage("extract", _extract_job, workers=EXTRACT_WORKERS, processes=True),
+            Stage("classify", lambda job: _classify_job(job, rule_engine, deduplicator)),
+            Stage("write", _write_job),
+        ],
+        max_pending=1
+    )
+
+    results = pipeline.run(jobs)
+
+    failures = [result for result in results if isinstance(result, StageFailure)]
+    for failure in failures:
+        print(
+            f"\nFailed ({failure.stage_name}): "
+            f"{failure.item['pdf_path']}: {failure.error}"
+        )
+
+    print_review_summary(
+        [result for result in results if not isinstance(result, StageFailure)]
+    )
+
+    print("\nStage metrics:")
+    for line in pipeline.report():
+        print(f"  {line}")
+
+    print(f"\nStatements processed: {len(results) - len(failures)} of {len(jobs)}")
+
+
+def reject_options(names, mode):
+    given = [f"--{name.replace('_', '-')}" for name in names if name in OPTIONS]
+    if given:
+        print(f"\n{', '.join(given)} cannot be combined with {mode}.")
+        sys.exit(1)
+
+
+def main():
+
+    if BATCH_MODE:
+        reject_options(BATCH_UNSUPPORTED, "--batch")
+        run_batch(expand_inputs(PDF_PATH, [".pdf"]))
+        return
+
+    if CHUNK_SIZE:
+        reject_options(CHUNKED_UNSUPPORTED, "--chunk-size")
+
+    state = {}
+    previous = None
+
+    if INCREMENTAL:
+        state = load_state(STATE_PATH)
+        pdf_hash = file_hash(PDF_PATH)
+        previous = state.get(pdf_hash)
+
+    if (
+        previous
+        and os.path.exists(EXCEL_PATH)
+        and file_hash(EXCEL_PATH) == previous.get("statement_hash")
+    ):
+        print("\nStatement already extracted in a previous run; reusing bank_statement.xlsx.")
+
+    else:
+        # 1️⃣ Extract Bank Statement
+        # A retry after a locked output file resumes from the page
+        # checkpoints instead of extracting the PDF again.
+        resume = [RESUME]
+        review = {}
+
+        def extract():
+            should_resume = resume[0]
+            resume[0] = True
+            final_df = extract_bank_statement(
+                PDF_PATH,
+                EXCEL_PATH,
+                resume=should_resume,
+                pages_per_chunk=PAGES_PER_CHUNK,
+                profile=BANK_PROFILE,
+                page_timeout=PAGE_TIMEOUT
+            )
+            # Keep only the checks, not the extracted frame, for the rest of the run
+            review["reconciliation"] = final_df.attrs["reconciliation"]
+            review["degraded_pages"] = final_df.attrs["degraded_pages"]
+
+        with PROFILER.stage("extract"):
+            safe_excel_write(extract, EXCEL_PATH)
+
+        print("\nBank statement generated successfully.")
+
+        # 2️⃣ Human Confirmation Step
+        # A statement whose running balances all reconcile needs no review,
+        # unless a page range was degraded: rows missing before the first or
+        # after the last printed balance would not break the reconciliation.
+        if review["reconciliation"]["clean"] and not review["degraded_pages"]:
+            print("Running balances reconcile; skipping the review step.")
+        elif not confirm_step("Please review the generated bank_statement.xlsx file before proceeding."):
+            print("\nProcess stopped by user after bank statement generation.")
+            return
+
+    if CHUNK_SIZE:
+        with PROFILER.stage("chunked"):
+            run_chunked(EXCEL_PATH, output_paths(OUTPUT_DIR), CHUNK_SIZE)
+        return
+
+    # 3️⃣ Load statement
+    with PROFILER.stage("load"):
+        df = pd.read_excel(EXCEL_PATH)
+        transactions = Transaction.from_frame(df)
+
+    # 4️⃣ Setup rule engine
+    rule_engine = RuleEngine(RULE_PATH)
+    engine = build_engine(rule_engine)
+
+    # 5️⃣ Process transactions
+    if not INCREMENTAL:
+        with PROFILER.stage("classify"):
+            matched_rules = None
+            if CLASSIFY_WORKERS:
+                # One shard per worker, whatever the statement's size
+                shard_size = max(1, math.ceil(len(transactions) / CLASSIFY_WORKERS))
+                with ShardedClassifier(rule_engine, CLASSIFY_WORKERS, shard_size) as classifier:
+                    matched_rules = classifier.match_all(transactions)
+            vouchers = engine.process(transactions, matched_rules)
+        with PROFILER.stage("write"):
+            write_outputs(vouchers, engine, output_paths(OUTPUT_DIR))
+        return
+
+    with PROFILER.stage("classify"):
+        keys = transaction_keys(transactions)
+        classifier = IncrementalClassifier(rule_engine, previous)
+        matched_rules = classifier.classify(transactions, keys)
+        vouchers = engine.process(transactions, matched_rules)
+
+    print(
+        f"\nIncremental run: {classifier.reevaluated} transactions re-evaluated, "
+        f"{classifier.reused} kept their previous rule."
+    )
+
+    entry = {
+        "statement_hash": file_hash(EXCEL_PATH),
+        "duplicate_hash": file_hash(DUPLICATE_JSON_PATH) if DUPLICATE_JSON_PATH else None,
+        "rules": classifier.fingerprints,
+        "assignments": classifier.assignments(keys, matched_rules),
+        "bank_ledger": BANK_LEDGER,
+        "output_options": output_options(),
+    }
+    paths = output_paths(OUTPUT_DIR)
+
+    # The output files are only left alone if they are still the ones this
+    # statement's previous run wrote with the same ledger and options;
+    # another statement's run in between replaces them.
+    if (
+        previous
+        and entry["assignments"] == previous.get("assignments")
+        and entry["duplicate_hash"] == previous.get("duplicate_hash")
+        and entry["bank_ledger"] == previous.get("bank_ledger")
+        and entry["output_options"] == previous.get("output_options")
+        and previous.get("outputs") == output_hashes(paths)
+    ):
+        print("\nNo classification changes; output files left as they are.")
+        entry["outputs"] = previous["outputs"]
+    else:
+        with PROFILER.stage("write"):
+            write_outputs(vouchers, engine, paths)
+        entry["outputs"] = output_hashes(paths)
+
+    state[pdf_hash] = entry
+    save_state(STATE_PATH, state)
 
 
 if __name__ == "__main__":
     main()
+    PROFILER.print_report()
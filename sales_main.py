@@ -1,17 +1,45 @@
+import glob
+import os
+import posixpath
 import sys
+import zipfile
+from xml.etree import ElementTree
+
+import numpy as np
 import pandas as pd
-from openpyxl import load_workbook
 
-from utils.file_writer import safe_excel_write
+from core.amounts import parse_amounts
+from utils.cli import expand_inputs, parse_args
+from utils.file_writer import StreamingExcelWriter, safe_excel_write
+from utils.profiling import StageProfiler
+
 
+ARGS, OPTIONS = parse_args(sys.argv[1:])
 
-if len(sys.argv) > 1:
-    SALES_FILE_PATH = sys.argv[1]
+if len(ARGS) > 0:
+    SALES_FILE_PATH = ARGS[0]
 else:
     SALES_FILE_PATH = "./input/Sales/Arjun Rao Sales JAN26.xlsx"
 
+# A directory or glob (or --batch) merges every register into one import.
+BATCH_MODE = (
+    bool(OPTIONS.get("batch"))
+    or os.path.isdir(SALES_FILE_PATH)
+    or (not os.path.isfile(SALES_FILE_PATH) and glob.has_magic(SALES_FILE_PATH))
+)
+NUMBERING = OPTIONS.get("numbering", "global")
+WORKERS = int(OPTIONS["workers"]) if "workers" in OPTIONS else None
+
+# --profile reports time and peak memory per stage
+PROFILER = StageProfiler(enabled=bool(OPTIONS.get("profile")))
+
 FINAL_OUTPUT = "./output/sales_import_ready.xlsx"
 
+_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_TABLE_REL = f"{_REL_NS}/table"
+
 REQUIRED_COLUMNS = [
     "DATE",
     "INVOICE NO",
@@ -27,20 +55,6 @@ def _normalize_columns(columns):
     }
 
 
-def _parse_amount(value):
-    if pd.isna(value):
-        return 0.0
-
-    text = str(value).replace(",", "").strip()
-    if text == "":
-        return 0.0
-
-    try:
-        return float(text)
-    except ValueError:
-        return 0.0
-
-
 def _format_date(value):
     parsed = pd.to_datetime(value, errors="coerce", dayfirst=False)
     if pd.isna(parsed):
@@ -48,86 +62,309 @@ def _format_date(value):
     return parsed.strftime("%d-%m-%Y")
 
 
-def _read_sales_table(sales_file_path):
-    wb = load_workbook(sales_file_path, data_only=True)
-    ws = wb.worksheets[0]
+def _format_date_column(values):
+    # Registers repeat a few hundred distinct dates over many invoices, so
+    # format each distinct value once and broadcast it back.
+    codes, uniques = pd.factorize(values)
+    formatted = [_format_date(value) for value in uniques]
+    formatted.append("")  # factorize codes missing values as -1
+    return pd.Series(
+        np.asarray(formatted, dtype=object)[codes],
+        index=values.index
+    )
+
+
+def _text_column(values):
+    return pd.Series(
+        [str(value).strip() for value in values.to_numpy(dtype=object)],
+        index=values.index,
+        dtype=object
+    )
+
+
+def _find_table_ref(sales_file_path, sheet_index=0):
+    """
+    Returns the cell range of the "Sales" table (or the sheet's first table)
+    by reading only the workbook, relationship and table parts of the xlsx,
+    without parsing any worksheet data. Returns None if the sheet has no table.
+    """
+
+    with zipfile.ZipFile(sales_file_path) as archive:
+        names = set(archive.namelist())
+
+        workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+        sheets = workbook.findall(f"{{{_MAIN_NS}}}sheets/{{{_MAIN_NS}}}sheet")
+        if sheet_index >= len(sheets):
+            return None
+
+        sheet_rel_id = sheets[sheet_index].get(f"{{{_REL_NS}}}id")
+        sheet_path = _relationship_targets(archive, "xl/workbook.xml").get(sheet_rel_id)
+        if sheet_path is None:
+            return None
+
+        sheet_dir, sheet_name = posixpath.split(sheet_path)
+        sheet_rels_path = posixpath.join(sheet_dir, "_rels", f"{sheet_name}.rels")
+        if sheet_rels_path not in names:
+            return None
+
+        tables = []
+        for target in _relationship_targets(archive, sheet_path, _TABLE_REL).values():
+            table = ElementTree.fromstring(archive.read(target))
+            tables.append((table.get("name"), table.get("ref")))
+
+    for name, ref in tables:
+        if name == "Sales":
+            return ref
+
+    return tables[0][1] if tables else None
+
+
+def _relationship_targets(archive, part_path, rel_type=None):
+    part_dir, part_name = posixpath.split(part_path)
+    rels = ElementTree.fromstring(
+        archive.read(posixpath.join(part_dir, "_rels", f"{part_name}.rels"))
+    )
+
+    targets = {}
+    for rel in rels.findall(f"{{{_PKG_REL_NS}}}Relationship"):
+        if rel_type and rel.get("Type") != rel_type:
+            continue
 
-    if "Sales" in ws.tables:
-        table = ws.tables["Sales"]
-    elif ws.tables:
-        first_table_name = next(iter(ws.tables))
-        table = ws.tables[first_table_name]
-    else:
-        df = pd.read_excel(sales_file_path, sheet_name=0)
-        return df
+        target = rel.get("Target")
+        if target.startswith("/"):
+            target = target.lstrip("/")
+        else:
+            target = posixpath.normpath(posixpath.join(part_dir, target))
+        targets[rel.get("Id")] = target
 
-    table_data = [
-        [cell.value for cell in row]
-        for row in ws[table.ref]
-    ]
+    return targets
 
-    if not table_data:
-        return pd.DataFrame()
 
-    headers = [str(col).strip() if col is not None else "" for col in table_data[0]]
-    rows = table_data[1:]
-    return pd.DataFrame(rows, columns=headers)
+def _read_sales_table(sales_file_path, sheet_index=0):
+    from openpyxl import load_workbook
+    from openpyxl.utils import range_boundaries
 
+    table_ref = _find_table_ref(sales_file_path, sheet_index)
+    if table_ref is None:
+        return pd.read_excel(sales_file_path, sheet_name=sheet_index)
+
+    min_col, min_row, max_col, max_row = range_boundaries(table_ref)
+
+    # Read-only mode streams the sheet XML and only yields the values inside
+    # the table range instead of building the full cell object model.
+    wb = load_workbook(sales_file_path, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[sheet_index].iter_rows(
+            min_row=min_row,
+            max_row=max_row,
+            min_col=min_col,
+            max_col=max_col,
+            values_only=True
+        )
+
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame()
+
+        headers = [str(col).strip() if col is not None else "" for col in header]
+        return pd.DataFrame(list(rows), columns=headers)
+    finally:
+        wb.close()
+
+
+def _sheet_names(sales_file_path):
+    with zipfile.ZipFile(sales_file_path) as archive:
+        workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+
+    return [
+        sheet.get("name")
+        for sheet in workbook.findall(f"{{{_MAIN_NS}}}sheets/{{{_MAIN_NS}}}sheet")
+    ]
+
+
+def _build_journal(df):
+    """
+    Converts one sales table into unnumbered Journal rows.
+    Returns the rows and a summary of how many were exported or skipped.
+    """
 
-def build_sales_vouchers(sales_file_path):
-    df = _read_sales_table(sales_file_path)
     df = df.rename(columns=_normalize_columns(df.columns))
 
     missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
     if missing:
         raise ValueError(f"Missing required columns: {', '.join(missing)}")
 
-    records = []
+    dates = _format_date_column(df["DATE"])
+    descriptions = _text_column(df["PARTICULARS"])
+    narrations = _text_column(df["INVOICE NO"])
+    amounts = parse_amounts(df["GROSS VALUE"], default=0.0)
 
-    for _, row in df.iterrows():
-        date = _format_date(row.get("DATE"))
-        if not date:
-            continue
+    no_date = dates == ""
+    no_particulars = ~no_date & (descriptions == "")
+    keep = ~no_date & ~no_particulars & (amounts > 0)
 
-        description = str(row.get("PARTICULARS", "")).strip()
-        if description == "":
-            continue
+    summary = {
+        "exported": int(keep.sum()),
+        "no_date": int(no_date.sum()),
+        "empty_particulars": int(no_particulars.sum()),
+        "non_positive_gross": int((~no_date & ~no_particulars & ~keep).sum()),
+    }
 
-        amount = _parse_amount(row.get("GROSS VALUE"))
-        if amount <= 0:
-            continue
+    if not keep.any():
+        return pd.DataFrame(), summary
 
-        records.append(
-            {
-                "Voucher_Type": "Journal",
-                "Date": date,
-                "Description": description,
-                "Narration": str(row.get("INVOICE NO", "")).strip(),
-                "Cr_Ledger": "Contract Receipts",
-                "Amount": amount,
-                "Cr": "CR",
-                "Dr_Ledger": "S.C.Rly",
-                "Dr_Amount": amount,
-                "Dr": "DR"
-            }
-        )
+    amounts = amounts[keep].to_numpy()
+
+    output_df = pd.DataFrame(
+        {
+            "Voucher_Type": "Journal",
+            "Date": dates[keep].to_numpy(),
+            "Description": descriptions[keep].to_numpy(),
+            "Narration": narrations[keep].to_numpy(),
+            "Cr_Ledger": "Contract Receipts",
+            "Amount": amounts,
+            "Cr": "CR",
+            "Dr_Ledger": "S.C.Rly",
+            "Dr_Amount": amounts,
+            "Dr": "DR"
+        }
+    )
+
+    return output_df, summary
+
+
+def build_sales_vouchers(sales_file_path):
+    output_df, _ = _build_journal(_read_sales_table(sales_file_path))
 
-    output_df = pd.DataFrame(records)
     if not output_df.empty:
-        output_df.reset_index(drop=True, inplace=True)
         output_df.insert(0, "Voucher_Num", output_df.index + 1)
 
     return output_df
 
 
+# -------- Batch Mode --------
+
+def _skip_reason(error):
+    # ValueErrors are this module's own messages; name anything else
+    if isinstance(error, ValueError):
+        return str(error)
+    return f"{type(error).__name__}: {error}"
+
+
+def _parse_sales_workbook(sales_file_path):
+    """
+    Builds Journal rows for every sheet of one workbook.
+    Runs in a worker process, so it returns plain results instead of printing.
+    A workbook or sheet that cannot be read becomes a skipped entry in the
+    results instead of failing the whole batch.
+    """
+
+    try:
+        sheet_names = _sheet_names(sales_file_path)
+    except Exception as e:
+        return [(pd.DataFrame(), {"error": _skip_reason(e), "file": sales_file_path, "sheet": None})]
+
+    results = []
+
+    for sheet_index, sheet_name in enumerate(sheet_names):
+        try:
+            output_df, summary = _build_journal(
+                _read_sales_table(sales_file_path, sheet_index)
+            )
+        except Exception as e:
+            output_df, summary = pd.DataFrame(), {"error": _skip_reason(e)}
+
+        summary["file"] = sales_file_path
+        summary["sheet"] = sheet_name
+        results.append((output_df, summary))
+
+    return results
+
+
+def build_sales_batch(sales_file_paths, numbering="global", workers=None):
+    """
+    Parses sales registers in a process pool and concatenates their Journal
+    rows. numbering="global" numbers vouchers 1..N across all files,
+    numbering="sheet" restarts at 1 for every sheet.
+    """
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    frames = []
+    summaries = []
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for results in executor.map(_parse_sales_workbook, sales_file_paths):
+            for output_df, summary in results:
+                summaries.append(summary)
+
+                if output_df.empty:
+                    continue
+
+                if numbering == "sheet":
+                    output_df.insert(0, "Voucher_Num", np.arange(1, len(output_df) + 1))
+                frames.append(output_df)
+
+    if not frames:
+        return pd.DataFrame(), summaries
+
+    vouchers_df = pd.concat(frames, ignore_index=True)
+    if numbering != "sheet":
+        vouchers_df.insert(0, "Voucher_Num", vouchers_df.index + 1)
+
+    return vouchers_df, summaries
+
+
+def print_batch_summary(summaries):
+    print("\nPer-sheet summary:")
+
+    for summary in summaries:
+        label = os.path.basename(summary["file"])
+        if summary["sheet"] is not None:
+            label += f" [{summary['sheet']}]"
+
+        if "error" in summary:
+            print(f"  {label}: skipped ({summary['error']})")
+            continue
+
+        print(
+            f"  {label}: exported {summary['exported']}, skipped "
+            f"{summary['no_date']} no date, "
+            f"{summary['empty_particulars']} empty particulars, "
+            f"{summary['non_positive_gross']} non-positive gross"
+        )
+
+
 def main():
-    vouchers_df = build_sales_vouchers(SALES_FILE_PATH)
+    if BATCH_MODE:
+        sales_files = expand_inputs(SALES_FILE_PATH, [".xlsx", ".xlsm"])
+        if not sales_files:
+            print("\nNo sales workbooks found.")
+            return
+
+        with PROFILER.stage("build"):
+            vouchers_df, summaries = build_sales_batch(
+                sales_files,
+                numbering=NUMBERING,
+                workers=WORKERS
+            )
+        print_batch_summary(summaries)
+
+        def write_vouchers():
+            writer = StreamingExcelWriter(FINAL_OUTPUT)
+            writer.append_frame("Journal", vouchers_df)
+            writer.close()
+
+    else:
+        with PROFILER.stage("build"):
+            vouchers_df = build_sales_vouchers(SALES_FILE_PATH)
 
-    def write_vouchers():
-        with pd.ExcelWriter(FINAL_OUTPUT, engine="openpyxl") as writer:
-            vouchers_df.to_excel(writer, sheet_name="Journal", index=False)
+        def write_vouchers():
+            with pd.ExcelWriter(FINAL_OUTPUT, engine="openpyxl") as writer:
+                vouchers_df.to_excel(writer, sheet_name="Journal", index=False)
 
-    safe_excel_write(write_vouchers, FINAL_OUTPUT)
+    with PROFILER.stage("write"):
+        safe_excel_write(write_vouchers, FINAL_OUTPUT)
 
     print("\nSales import file generated successfully.")
     print(f"Rows exported: {len(vouchers_df)}")
@@ -136,3 +373,4 @@ def main():
 
 if __name__ == "__main__":
     main()
+    PROFILER.print_report()
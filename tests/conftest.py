@@ -0,0 +1,64 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RULE_PATH = os.path.join(REPO_ROOT, "rules", "description_rules.json")
+
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+# (description, is a deposit) as the extractors leave them; the last one
+# matches no rule
+_ROWS = [
+    ("UPI/P2A/{n:012d}/Car EMI/Axis Bank", False),
+    ("NEFT/{n:012d}/HAREESH ENTERPRISES", True),
+    ("NEFT/{n:012d}/Home loan instalment", False),
+    ("IMPS/{n:012d}/SBI 79382/Transfer", True),
+    ("Debit Interest Capitalized", False),
+    ("UPI/P2M/{n:012d}/SWIGGY BANGALORE", False),
+]
+
+
+def statement_frame(rows):
+    """
+    A generated bank statement in the extractor's column layout, with the
+    amounts as text the way they come out of the PDF.
+    """
+
+    import pandas as pd
+
+    records = []
+    balance = 10_000_000
+
+    for n in range(rows):
+        description, deposit = _ROWS[n % len(_ROWS)]
+        amount = 100 + (n * 37) % 90_000
+        balance += amount if deposit else -amount
+        day = n % 28 + 1
+
+        records.append({
+            "Transaction Date": f"2024-11-{day:02d}",
+            "Value Date": f"2024-11-{day:02d}",
+            "Description": description.format(n=n),
+            "Reference Number": f"REF{n:010d}",
+            "Withdrawals": "" if deposit else f"{amount:,.2f}",
+            "Deposits": f"{amount:,.2f}" if deposit else "",
+            "Running Balance": f"{balance:,.2f}",
+        })
+
+    return pd.DataFrame(records)
+
+
+@pytest.fixture
+def main_module(monkeypatch):
+    # main.py reads its options from sys.argv at import time
+    monkeypatch.setattr(sys, "argv", ["main.py", "statement.pdf", "494", f"--rules={RULE_PATH}"])
+    sys.modules.pop("main", None)
+    module = importlib.import_module("main")
+    yield module
+    sys.modules.pop("main", None)
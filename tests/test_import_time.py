@@ -0,0 +1,47 @@
+import subprocess
+import sys
+
+import pytest
+
+from conftest import REPO_ROOT
+
+
+# Only the paths that use them may import these
+HEAVY_MODULES = {"camelot", "openpyxl", "tkinter", "_tkinter"}
+
+# Seconds for the whole import chain, pandas included
+IMPORT_BUDGET = 3.0
+
+
+def import_times(module):
+    """
+    Runs python -X importtime on a fresh interpreter and returns
+    {module name: cumulative microseconds}.
+    """
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+
+    return times
+
+
+@pytest.mark.parametrize("module", ["main", "sales_main"])
+def test_import_chain_stays_light(module):
+    times = import_times(module)
+
+    heavy = sorted(name for name in times if name.split(".")[0] in HEAVY_MODULES)
+    assert not heavy, f"{module} imports {heavy} at start-up"
+
+    assert times[module] / 1_000_000 < IMPORT_BUDGET
@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+from conftest import RULE_PATH, statement_frame
+from core.rule_engine import RuleEngine
+from core.transaction import Transaction
+from utils.profiling import StageProfiler
+
+
+ROWS = 10_000
+
+# Peak Python allocations per 10k statement rows, about 10-25% over what
+# the current code needs (3.5MB, 2.3MB and 1.9MB). Going back to
+# iterrows, or holding extra copies of the voucher sub-frames while
+# writing, goes over them.
+MB = 1024 * 1024
+FROM_FRAME_CEILING = 3.8 * MB
+PROCESS_CEILING = 2.9 * MB
+WRITE_CEILING = 2.4 * MB
+
+
+@pytest.fixture(scope="module")
+def statement():
+    return statement_frame(ROWS)
+
+
+def peak_allocated(function):
+    profiler = StageProfiler()
+    with profiler.stage("test") as stats:
+        result = function()
+    return stats.peak_allocated, result
+
+
+def test_profiler_peak_excludes_memory_held_before_the_stage():
+    held = bytearray(16 * MB)
+    peak, _ = peak_allocated(lambda: bytearray(MB))
+    assert MB <= peak < 4 * MB
+    del held
+
+
+def test_transaction_from_frame_memory(statement):
+    peak, transactions = peak_allocated(lambda: Transaction.from_frame(statement))
+    assert len(transactions) == ROWS
+    assert peak < FROM_FRAME_CEILING
+
+
+def test_voucher_engine_process_memory(statement, main_module):
+    transactions = Transaction.from_frame(statement)
+    engine = main_module.build_engine(RuleEngine(RULE_PATH))
+
+    peak, vouchers = peak_allocated(lambda: engine.process(transactions))
+    assert len(vouchers) + len(engine.unclassified) == ROWS
+    assert vouchers
+    assert peak < PROCESS_CEILING
+
+
+def test_write_outputs_memory(statement, main_module, tmp_path, capsys):
+    transactions = Transaction.from_frame(statement)
+    engine = main_module.build_engine(RuleEngine(RULE_PATH))
+    vouchers = engine.process(transactions)
+    paths = main_module.output_paths(str(tmp_path))
+
+    # openpyxl is imported on first use; keep that out of the measurement
+    warm_up = main_module.build_engine(RuleEngine(RULE_PATH))
+    warm_up_paths = main_module.output_paths(str(tmp_path / "warm_up"))
+    os.makedirs(str(tmp_path / "warm_up"))
+    main_module.write_outputs(warm_up.process(transactions[:50]), warm_up, warm_up_paths)
+
+    peak, _ = peak_allocated(lambda: main_module.write_outputs(vouchers, engine, paths))
+    assert (tmp_path / "statement_import_ready.xlsx").exists()
+    assert (tmp_path / "unclassified.xlsx").exists()
+    assert peak < WRITE_CEILING
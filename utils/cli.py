@@ -0,0 +1,49 @@
+import glob
+import os
+
+
+def parse_args(argv):
+    """
+    Splits argv into positional arguments and options.
+    Options use --name=value, bare --name flags are stored as True.
+    Dashes in option names become underscores.
+    """
+
+    positional = []
+    options = {}
+
+    for arg in argv:
+        if not arg.startswith("--"):
+            positional.append(arg)
+            continue
+
+        name, sep, value = arg[2:].partition("=")
+        options[name.replace("-", "_")] = value if sep else True
+
+    return positional, options
+
+
+def expand_inputs(path, extensions):
+    """
+    Resolves a file, directory or glob pattern into a sorted list of
+    input files with one of the given extensions.
+    """
+
+    # An existing file wins over glob syntax: "Sales [Jan].xlsx" is a name
+    if os.path.isfile(path):
+        candidates = [path]
+    elif os.path.isdir(path):
+        candidates = [os.path.join(path, name) for name in os.listdir(path)]
+    elif glob.has_magic(path):
+        candidates = glob.glob(path)
+    else:
+        candidates = [path]
+
+    # "~$name.xlsx" is the owner file Office keeps next to an open workbook
+    return sorted(
+        candidate
+        for candidate in candidates
+        if os.path.isfile(candidate)
+        and candidate.lower().endswith(tuple(extensions))
+        and not os.path.basename(candidate).startswith("~$")
+    )
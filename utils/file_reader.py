@@ -0,0 +1,34 @@
+def iter_excel_rows(file_path, chunk_size):
+    """
+    Streams the first sheet of a workbook as lists of row dicts keyed by
+    the header row, chunk_size rows at a time, without loading the sheet
+    into memory. Empty cells come back as NaN, like pd.read_excel.
+    """
+
+    from openpyxl import load_workbook
+
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+
+        columns = [str(col) if col is not None else "" for col in header]
+        chunk = []
+
+        for values in rows:
+            chunk.append({
+                column: float("nan") if value is None else value
+                for column, value in zip(columns, values)
+            })
+
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+
+        if chunk:
+            yield chunk
+    finally:
+        wb.close()
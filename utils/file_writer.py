@@ -1,3 +1,4 @@
+import os
 import sys
 import time
 
@@ -30,3 +31,45 @@ def safe_excel_write(write_function, file_path, max_retries=3):
         except Exception as e:
             print(f"\nUnexpected error while writing '{file_path}': {e}")
             sys.exit(1)
+
+
+def remove_stale_output(file_path):
+    """
+    Deletes an output file left by an earlier run that this run has
+    nothing to write into, so it cannot be mistaken for current output.
+    """
+
+    if os.path.exists(file_path):
+        safe_excel_write(lambda: os.remove(file_path), file_path)
+
+
+class StreamingExcelWriter:
+    """
+    Appends rows to a write-only openpyxl workbook, so large outputs are
+    streamed to disk instead of kept as cell objects in memory.
+    Sheets are created on first use, with the columns as the header row.
+    """
+
+    def __init__(self, file_path):
+        from openpyxl import Workbook
+
+        self.file_path = file_path
+        self.workbook = Workbook(write_only=True)
+        self.sheets = {}
+
+    def append_frame(self, sheet_name, df):
+        if df.empty:
+            return
+
+        sheet = self.sheets.get(sheet_name)
+        if sheet is None:
+            sheet = self.workbook.create_sheet(sheet_name)
+            sheet.append([str(col) for col in df.columns])
+            self.sheets[sheet_name] = sheet
+
+        values = df.astype(object).where(df.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            sheet.append(row)
+
+    def close(self):
+        self.workbook.save(self.file_path)
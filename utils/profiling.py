@@ -0,0 +1,104 @@
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+def _rss_bytes():
+    """
+    Returns (current RSS, peak RSS) of this process in bytes.
+    psutil covers Windows as well; without it the resource module gives the
+    peak only, and neither is available on a bare Windows install.
+    """
+
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        # Windows reports the peak working set; elsewhere only the current RSS
+        return info.rss, getattr(info, "peak_wset", None)
+
+    try:
+        import resource
+    except ImportError:
+        return None, None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    if sys.platform != "darwin":
+        peak *= 1024
+    return None, peak
+
+
+def _megabytes(value):
+    if value is None:
+        return "     n/a"
+    return f"{value / (1024 * 1024):6.1f}MB"
+
+
+class StageStats:
+    def __init__(self, name):
+        self.name = name
+        self.seconds = 0.0
+        self.peak_allocated = None
+        self.rss = None
+        self.peak_rss = None
+
+    def describe(self):
+        return (
+            f"{self.name:<10} time: {self.seconds:8.2f}s  "
+            f"python peak: {_megabytes(self.peak_allocated)}  "
+            f"rss: {_megabytes(self.rss)}  "
+            f"peak rss: {_megabytes(self.peak_rss)}"
+        )
+
+
+class StageProfiler:
+    """
+    Times the stages of a run and samples memory around each one: the peak
+    of Python allocations inside the stage over what was already allocated
+    when it started (tracemalloc) and the process RSS when it ends. tracemalloc slows allocation-heavy code noticeably,
+    so a disabled profiler records and reports nothing.
+    Stages are not meant to nest; tracemalloc keeps one peak per process.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name):
+        stats = StageStats(name)
+
+        if not self.enabled:
+            yield stats
+            return
+
+        self.stages.append(stats)
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+
+        started = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            stats.seconds = time.perf_counter() - started
+            stats.peak_allocated = max(tracemalloc.get_traced_memory()[1] - baseline, 0)
+            stats.rss, stats.peak_rss = _rss_bytes()
+
+    def report(self):
+        return [stats.describe() for stats in self.stages]
+
+    def print_report(self):
+        if not self.stages:
+            return
+
+        print("\nStage profile:")
+        for line in self.report():
+            print(f"  {line}")
@@ -0,0 +1,166 @@
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from utils.file_writer import remove_stale_output, safe_excel_write
+
+
+VOUCHER_SHEETS = ("Payment", "Receipt", "Contra")
+SHARD_KEYS = ("ledger", "month")
+
+
+def _month_key(date):
+    # Dates are dd-mm-yyyy strings from Transaction
+    date = str(date)
+    if len(date) != 10:
+        return "undated"
+    return f"{date[6:10]}-{date[3:5]}"
+
+
+def _ledger_key(df, bank_ledger):
+    # The counter ledger is whichever side is not the bank itself
+    return df["Dr_Ledger"].where(df["Dr_Ledger"] != bank_ledger, df["Cr_Ledger"]).astype(str)
+
+
+def _slug(text):
+    return re.sub(r"[^A-Za-z0-9]+", "_", str(text)).strip("_") or "blank"
+
+
+def plan_shards(df_output, bank_ledger, shard_by=(), max_rows=None):
+    """
+    Splits vouchers into shards per voucher type, optionally by counter
+    ledger and/or month, and into parts of at most max_rows.
+    Shards are ordered by their key and Voucher_Num runs continuously per
+    voucher type across them, so every shard holds one contiguous range.
+    """
+
+    shards = []
+
+    for voucher_type in VOUCHER_SHEETS:
+        type_df = df_output[df_output["Voucher_Type"] == voucher_type]
+        if type_df.empty:
+            continue
+
+        keys = pd.DataFrame(index=type_df.index)
+        if "ledger" in shard_by:
+            keys["ledger"] = _ledger_key(type_df, bank_ledger)
+        if "month" in shard_by:
+            keys["month"] = type_df["Date"].map(_month_key)
+
+        if keys.columns.empty:
+            groups = [({}, type_df)]
+        else:
+            groups = [
+                (dict(zip(keys.columns, key if isinstance(key, tuple) else (key,))), group)
+                for key, group in type_df.groupby(
+                    [keys[col] for col in keys.columns],
+                    sort=True
+                )
+            ]
+
+        next_number = 1
+
+        for key, group in groups:
+            step = max_rows or len(group)
+
+            for part, start in enumerate(range(0, len(group), step), start=1):
+                shard_df = group.iloc[start:start + step].reset_index(drop=True)
+                shard_df.insert(0, "Voucher_Num", shard_df.index + next_number)
+                next_number += len(shard_df)
+
+                shards.append({
+                    "voucher_type": voucher_type,
+                    "key": key,
+                    "part": part,
+                    "df": shard_df,
+                })
+
+    return shards
+
+
+def _shard_file_name(stem, shard):
+    parts = [stem, shard["voucher_type"]]
+    parts.extend(_slug(shard["key"][name]) for name in SHARD_KEYS if name in shard["key"])
+    parts.append(f"{shard['part']:03d}")
+    return "_".join(parts) + ".xlsx"
+
+
+def _write_shard_file(file_path, sheet_name, df):
+    with pd.ExcelWriter(file_path, engine="openpyxl") as writer:
+        df.to_excel(writer, sheet_name=sheet_name, index=False)
+
+
+def _write_shard(file_path, sheet_name, df):
+    # Runs in a worker process, which cannot prompt the user, so a locked
+    # file is reported back instead of retried.
+    try:
+        _write_shard_file(file_path, sheet_name, df)
+    except PermissionError:
+        return False
+    return True
+
+
+def clear_shards(output_dir, stem):
+    """
+    Deletes the shard workbooks and manifest an earlier run left in
+    output_dir, so no file the current manifest does not list remains.
+    """
+
+    if not os.path.isdir(output_dir):
+        return
+
+    for name in os.listdir(output_dir):
+        if name == "manifest.json" or (name.startswith(f"{stem}_") and name.endswith(".xlsx")):
+            remove_stale_output(os.path.join(output_dir, name))
+
+
+def write_shards(shards, output_dir, stem, workers=None):
+    """
+    Writes each shard to its own workbook in parallel worker processes,
+    then writes manifest.json describing the files and voucher ranges.
+    Shards that fail on a locked file are retried here with the usual
+    safe_excel_write prompt.
+    """
+
+    os.makedirs(output_dir, exist_ok=True)
+    clear_shards(output_dir, stem)
+
+    paths = [os.path.join(output_dir, _shard_file_name(stem, shard)) for shard in shards]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        written = list(executor.map(
+            _write_shard,
+            paths,
+            [shard["voucher_type"] for shard in shards],
+            [shard["df"] for shard in shards]
+        ))
+
+    for path, shard, ok in zip(paths, shards, written):
+        if not ok:
+            safe_excel_write(
+                lambda: _write_shard_file(path, shard["voucher_type"], shard["df"]),
+                path
+            )
+
+    manifest = [
+        {
+            "file": os.path.basename(path),
+            "voucher_type": shard["voucher_type"],
+            **shard["key"],
+            "part": shard["part"],
+            "rows": len(shard["df"]),
+            "first_voucher": int(shard["df"]["Voucher_Num"].iloc[0]),
+            "last_voucher": int(shard["df"]["Voucher_Num"].iloc[-1]),
+        }
+        for path, shard in zip(paths, shards)
+    ]
+
+    manifest_path = os.path.join(output_dir, "manifest.json")
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest_path
+